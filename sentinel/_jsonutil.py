@@ -0,0 +1,136 @@
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the stdlib
+    orjson = None
+    import json
+
+try:
+    import simdjson
+except ImportError:  # optional, only used for large LLM responses
+    simdjson = None
+
+# Below this size simdjson's setup costs more than a plain full parse.
+_LAZY_MIN_BYTES = 1024
+
+# simdjson parsers are not thread-safe and a document is only valid until
+# its parser parses again, so each thread gets its own.
+_local = threading.local()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a str, keeping non-ASCII characters as-is."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _balanced_end(text: str, start: int) -> int:
+    """
+    Index of the '}' closing the '{' at text[start], or -1 if it never closes.
+    Braces inside JSON strings are skipped.
+    """
+    depth = 0
+    in_str = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def iter_json_objects(text: str) -> Iterator[str]:
+    """Yield each top-level {...} span in text, left to right."""
+    start = text.find("{")
+    while start != -1:
+        end = _balanced_end(text, start)
+        if end == -1:
+            return
+        yield text[start:end + 1]
+        start = text.find("{", end + 1)
+
+
+def _materialize(value: Any) -> Any:
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def _loads_object(js: str, keys: Optional[Iterable[str]]) -> Any:
+    """
+    Parse js. With keys given and simdjson installed, large documents are
+    parsed lazily and only those top-level keys are turned into Python objects.
+    """
+    if keys is None or simdjson is None or len(js) < _LAZY_MIN_BYTES:
+        return loads(js)
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = simdjson.Parser()
+    doc = parser.parse(js.encode("utf-8"))
+    if not isinstance(doc, simdjson.Object):
+        return None
+    return {k: _materialize(doc[k]) for k in keys if k in doc}
+
+
+def parse_json_object(
+    text: str,
+    keys: Optional[Iterable[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse the first JSON object embedded in an LLM response (which may be
+    wrapped in prose or markdown fences). Returns None if there is none.
+    If keys is given, only those top-level keys are guaranteed to be present.
+    """
+    if not text:
+        return None
+    t = text.strip()
+    if t.startswith("{") and t.endswith("}"):
+        try:
+            obj = _loads_object(t, keys)
+            return obj if isinstance(obj, dict) else None
+        except Exception:
+            pass
+    else:
+        # Prose or fences around one object: first '{' to last '}' is a
+        # two-pointer slice, far cheaper than the brace scan below.
+        start, end = t.find("{"), t.rfind("}")
+        if start == -1 or end < start:
+            return None
+        try:
+            obj = _loads_object(t[start:end + 1], keys)
+            if isinstance(obj, dict):
+                return obj
+        except Exception:
+            pass
+    for js in iter_json_objects(t):
+        try:
+            obj = _loads_object(js, keys)
+        except Exception:
+            continue
+        if isinstance(obj, dict):
+            return obj
+    return None
@@ -0,0 +1,129 @@
+"""
+On-disk tier for the per-utterance result caches: one SQLite row per
+utterance hash holding the Curator and Enricher results as JSON. Rows are
+loaded once at
+startup; writes are buffered and flushed every few turns and at exit, which
+also drops expired rows and the oldest ones beyond MAX_ROWS.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from .config import CACHE_DIR
+
+# Result columns; each ResultCache owns one.
+COLUMNS = ("curator", "enricher")
+
+# Bounds what every startup loads and indexes.
+MAX_ROWS = 10_000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+
+class CacheStore:
+    def __init__(
+        self,
+        path: Path = CACHE_DIR / "cache.sqlite",
+        max_rows: int = MAX_ROWS,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # hash -> {column: bytes}, not yet on disk
+        self._pending: Dict[str, Dict[str, Optional[bytes]]] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            # emb held embeddings for paraphrase hits, which are no longer made
+            conn.execute("DROP TABLE IF EXISTS emb")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(hash TEXT PRIMARY KEY, curator BLOB, enricher BLOB, ts REAL)"
+            )
+            self._prune(conn)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM results WHERE ts < ?", (time.time() - self.ttl_seconds,))
+        db.execute(
+            "DELETE FROM results WHERE hash IN "
+            "(SELECT hash FROM results ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def rows(self, column: str) -> Iterator[Tuple[str, bytes]]:
+        """(hash, result blob) for every stored result in column, oldest first."""
+        if column not in COLUMNS:
+            raise ValueError(f"unknown cache column: {column!r}")
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT hash, {column} FROM results WHERE {column} IS NOT NULL ORDER BY ts"
+            ).fetchall()
+        yield from rows
+
+    def put(self, key: str, column: str, result: bytes) -> None:
+        """Buffer a result; it reaches disk on the next flush()."""
+        if column not in COLUMNS:
+            raise ValueError(f"unknown cache column: {column!r}")
+        with self._lock:
+            self._pending.setdefault(key, {})[column] = result
+
+    def clear(self) -> None:
+        """Drop every stored and pending result."""
+        with self._lock:
+            self._pending = {}
+            db = self._db()
+            db.execute("DELETE FROM results")
+            db.commit()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            db = self._db()
+            now = time.time()
+            for key, row in pending.items():
+                db.execute(
+                    "INSERT INTO results (hash, curator, enricher, ts) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET "
+                    "curator = coalesce(excluded.curator, curator), "
+                    "enricher = coalesce(excluded.enricher, enricher), "
+                    "ts = excluded.ts",
+                    (key, row.get("curator"), row.get("enricher"), now),
+                )
+            self._prune(db)
+            db.commit()
+
+
+_store: Optional[CacheStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CacheStore:
+    """Process-wide store, flushed automatically at interpreter exit."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CacheStore()
+            atexit.register(flush_store)
+        return _store
+
+
+def flush_store() -> None:
+    if _store is None:
+        return
+    try:
+        _store.flush()
+    except Exception as e:
+        print(f"[WARN] Could not write result cache: {e}")
\ No newline at end of file
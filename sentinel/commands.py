@@ -2,6 +2,20 @@ from camel.storages import Neo4jGraph
 
 from .kg_store import connect_neo4j, show_recent_triplets, remove_knowledge
 from .kg_qa import run_kg_qa
+from .llm_cache import clear_default_cache
+from .semcache import clear_caches
+from .utils import in_daemon_thread
+
+
+def _clear_caches() -> None:
+    # Cached Curator/Enricher results and LLM replies would otherwise
+    # re-store or answer from facts that were just erased.
+    try:
+        clear_caches()
+        clear_default_cache()
+    except Exception as e:
+        print(f"[WARN] Could not clear caches: {e}")
+
 
 def handle_kg_command(neo: Neo4jGraph, base_model, user_input: str):
 
@@ -14,6 +28,7 @@ def handle_kg_command(neo: Neo4jGraph, base_model, user_input: str):
 
     if sub_lower == "clean":
         neo = connect_neo4j(clear=True)
+        _clear_caches()
         print("Assistant (KG): I have erased everything in the knowledge graph.")
         return True, neo
 
@@ -25,11 +40,16 @@ def handle_kg_command(neo: Neo4jGraph, base_model, user_input: str):
         parts = sub.split(maxsplit=1)
         if len(parts) == 1:
             print('Assistant (KG): Please provide a pattern to remove, e.g. "/kg remove War Thunder".')
-        else:
-            remove_knowledge(neo, parts[1].strip())
+        elif remove_knowledge(neo, parts[1].strip()):
+            _clear_caches()
         return True, neo
 
     question = sub.strip()
     answer = run_kg_qa(neo, base_model, question)
     print(f"Assistant (KG):\n{answer}\n")
-    return True, neo
\ No newline at end of file
+    return True, neo
+
+
+async def handle_kg_command_async(neo: Neo4jGraph, base_model, user_input: str):
+    """handle_kg_command on a worker thread; Neo4j and KG-QA calls block."""
+    return await in_daemon_thread(handle_kg_command, neo, base_model, user_input)
\ No newline at end of file
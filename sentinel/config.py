@@ -1,17 +1,23 @@
-import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
+from . import _jsonutil
+
 ROOT = Path(__file__).resolve().parents[1]
 NEO4J_CONFIG_PATH = ROOT / "neo4j_config.json"
 USER_PROFILE_PATH = ROOT / "user_profile.json"
+CACHE_DIR = Path(os.environ.get("SENTINEL_CACHE_DIR", Path.home() / ".sentinel"))
 
 
 def load_json(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    # Bytes go straight to the parser, no separate UTF-8 decode pass.
+    with path.open("rb") as f:
+        return _jsonutil.loads(f.read())
 
 
+@lru_cache(maxsize=1)
 def load_user_canonical_id(default: str = "User") -> str:
     try:
         data = load_json(USER_PROFILE_PATH)
@@ -26,6 +32,12 @@ def load_user_canonical_id(default: str = "User") -> str:
     return default
 
 
+@lru_cache(maxsize=4)
 def load_neo4j_config(path: Path = NEO4J_CONFIG_PATH) -> Dict[str, Any]:
-    print(f"[DEBUG] Loading Neo4j config from: {path}")
-    return load_json(path)
\ No newline at end of file
+    return load_json(path)
+
+
+def reload_config() -> None:
+    """Drop cached config so the next load re-reads the files."""
+    load_user_canonical_id.cache_clear()
+    load_neo4j_config.cache_clear()
\ No newline at end of file
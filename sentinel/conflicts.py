@@ -1,10 +1,13 @@
-from typing import Dict, List, Optional, Set
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from camel.agents import ChatAgent
-from camel.messages import BaseMessage
 from camel.storages import Neo4jGraph
 
-SINGLE_VALUED_RELATIONS: Set[str] = {
+from .kg_store import ENTITY_LABEL, MIRROR, forget_triplet, get_conflicting_triplets
+from .llm import pooled_agent
+
+SINGLE_VALUED_RELATIONS: FrozenSet[str] = frozenset({
     "LIVES_IN",
     "WORKS_AT",
     "STUDIES_AT",
@@ -13,31 +16,61 @@ SINGLE_VALUED_RELATIONS: Set[str] = {
     "HAS_BIRTHDATE",
     "CURRENT_ROLE",
     "CURRENT_JOB",
-}
+})
 
 
 def is_single_valued(rel_type: str) -> bool:
+    # Stored relations are already UPPER_SNAKE_CASE (see normalize_relation),
+    # so the common case never allocates an uppercased copy.
+    if rel_type in SINGLE_VALUED_RELATIONS:
+        return True
     return (rel_type or "").upper() in SINGLE_VALUED_RELATIONS
 
 
+def warm_known_facts(neo: Neo4jGraph) -> None:
+    """Mirror every stored single-valued fact in one query."""
+    cypher = f"""
+    MATCH (a:{ENTITY_LABEL})-[r]->(b:{ENTITY_LABEL})
+    WHERE type(r) IN $single
+    RETURN a.id AS subj, type(r) AS rel, b.id AS obj, r.timestamp AS timestamp
+    """
+    try:
+        rows = neo.query(cypher, {"single": sorted(SINGLE_VALUED_RELATIONS)}) or []
+    except Exception as e:
+        print(f"[WARN] Could not warm single-valued fact cache: {e}")
+        return
+    MIRROR.load(rows, SINGLE_VALUED_RELATIONS)
+
+
 def detect_conflicts(neo: Neo4jGraph, subj: str, rel_type: str, obj: str) -> List[Dict]:
     if not is_single_valued(rel_type):
         return []
-
-    triplets = neo.get_triplet()
-    conflicts = []
-
-    rel_norm = (rel_type or "").lower()
-
-    for t in triplets:
-        t_subj = t.get("subj", "")
-        t_rel = (t.get("rel", "") or "").lower()
-        t_obj = t.get("obj", "")
-
-        if t_subj == subj and t_rel == rel_norm and t_obj != obj:
-            conflicts.append(t)
-
-    return conflicts
+    rel = rel_type.upper()
+
+    # Answered from the in-process mirror when it knows (subj, rel); Neo4j
+    # only on a miss.
+    mirrored = MIRROR.get(subj, rel)
+    if mirrored is not None:
+        return [
+            {"subj": subj, "rel": rel, "obj": o, "timestamp": ts}
+            for o, ts in mirrored
+            if o != obj
+        ]
+
+    return get_conflicting_triplets(neo, subj, rel, obj)
+
+
+CONFLICT_SYSTEM_PROMPT = (
+    "You are an explainable AI module. The system has detected a conflict "
+    "between previously stored facts and a new fact about the same subject and relation.\n"
+    "You must:\n"
+    "1) Briefly explain the conflict in natural language.\n"
+    "2) Offer the user 3 clear options, exactly labeled 'A', 'B', and 'C', such as:\n"
+    "   - A: The old fact is outdated; the new fact is now correct.\n"
+    "   - B: Both facts are true (for example, different time periods or multiple roles).\n"
+    "   - C: The new fact is incorrect; keep the old one.\n"
+    "Keep your answer short and clear, and end by asking the user to reply with A, B, or C."
+)
 
 
 def xai_explain_conflict(
@@ -48,31 +81,12 @@ def xai_explain_conflict(
     new_obj: str,
     new_ts: str,
 ) -> str:
-    conflict_lines = []
-    for t in conflicts:
-        ts = t.get("timestamp", "no-time")
-        s = t.get("subj")
-        r = t.get("rel")
-        o = t.get("obj")
-        conflict_lines.append(f"[{ts}] {s} -[{r}]-> {o}")
-    conflict_text = "\n".join(conflict_lines)
-
-    system_msg = BaseMessage.make_assistant_message(
-        role_name="ConflictExplainer",
-        content=(
-            "You are an explainable AI module. The system has detected a conflict "
-            "between previously stored facts and a new fact about the same subject and relation.\n"
-            "You must:\n"
-            "1) Briefly explain the conflict in natural language.\n"
-            "2) Offer the user 3 clear options, exactly labeled 'A', 'B', and 'C', such as:\n"
-            "   - A: The old fact is outdated; the new fact is now correct.\n"
-            "   - B: Both facts are true (for example, different time periods or multiple roles).\n"
-            "   - C: The new fact is incorrect; keep the old one.\n"
-            "Keep your answer short and clear, and end by asking the user to reply with A, B, or C."
-        ),
+    conflict_text = "\n".join(
+        f"[{t.get('timestamp', 'no-time')}] {t.get('subj')} -[{t.get('rel')}]-> {t.get('obj')}"
+        for t in conflicts
     )
 
-    agent = ChatAgent(system_message=system_msg, model=base_model)
+    agent = pooled_agent("ConflictExplainer", CONFLICT_SYSTEM_PROMPT, base_model)
 
     prompt = (
         "Previously stored facts:\n"
@@ -86,26 +100,61 @@ def xai_explain_conflict(
     return resp.msg.content
 
 
+_EXACT_CHOICES: Dict[str, str] = {
+    "a": "A", "option a": "A",
+    "b": "B", "option b": "B",
+    "c": "C", "option c": "C",
+}
+
+# Checked in order, so "both are wrong" is still B.
+_FUZZY_CHOICES: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("A", re.compile(r"outdated|new fact is correct")),
+    ("B", re.compile(r"both")),
+    ("C", re.compile(r"keep the old|wrong|incorrect")),
+)
+
+
 def interpret_conflict_choice(user_text: str) -> Optional[str]:
-    t = user_text.strip().lower()
-
-    if t in ("a", "option a") or "outdated" in t or "new fact is correct" in t:
-        return "A"
-    if t in ("b", "option b") or "both" in t or "both true" in t:
-        return "B"
-    if t in ("c", "option c") or "keep the old" in t or "wrong" in t or "incorrect" in t:
-        return "C"
-
-    if t.startswith("a "):
-        return "A"
-    if t.startswith("b "):
-        return "B"
-    if t.startswith("c "):
-        return "C"
+    s = user_text.strip()
+    # The usual reply is a bare letter; answer it without a lowered copy.
+    if len(s) == 1 and s in "AaBbCc":
+        return s.upper()
+
+    t = s.casefold()
+
+    choice = _EXACT_CHOICES.get(t)
+    if choice is not None:
+        return choice
+
+    for letter, pattern in _FUZZY_CHOICES:
+        if pattern.search(t):
+            return letter
+
+    if t[:2] in ("a ", "b ", "c "):
+        return t[0].upper()
 
     return None
 
 
+# Relationship types cannot be parameterized, so rel is interpolated; the
+# handful of single-valued relations means these are built once each.
+@lru_cache(maxsize=64)
+def _cypher_set_status(rel: str) -> str:
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{ENTITY_LABEL} {{id: $subj}})-[r:`{rel}` {{timestamp: row.ts}}]->(b:{ENTITY_LABEL} {{id: row.obj}})
+    SET r.status = row.status
+    """
+
+
+@lru_cache(maxsize=64)
+def _cypher_delete(rel: str) -> str:
+    return f"""
+    MATCH (a:{ENTITY_LABEL} {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b:{ENTITY_LABEL} {{id: $obj}})
+    DELETE r
+    """
+
+
 def apply_conflict_resolution(neo: Neo4jGraph, choice: str, conflict: Dict) -> None:
     subj = conflict["subj"]
     rel = conflict["rel"]
@@ -113,50 +162,34 @@ def apply_conflict_resolution(neo: Neo4jGraph, choice: str, conflict: Dict) -> N
     new_ts = conflict["new_ts"]
     old_list = conflict["old"]
 
+    # One UNWIND per resolution instead of one round-trip per stored fact.
+    cypher_status = _cypher_set_status(rel)
+
     if choice == "A":
         print("Applying resolution A: mark old facts as past, new fact as current.")
-        for t in old_list:
-            o = t.get("obj")
-            ts = t.get("timestamp")
-            cypher = f"""
-            MATCH (a {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b {{id: $obj}})
-            SET r.status = 'past'
-            """
-            neo.query(cypher, {"subj": subj, "obj": o, "ts": ts})
-
-        cypher_new = f"""
-        MATCH (a {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b {{id: $obj}})
-        SET r.status = 'current'
-        """
-        neo.query(cypher_new, {"subj": subj, "obj": new_obj, "ts": new_ts})
+        rows = [
+            {"obj": t.get("obj"), "ts": t.get("timestamp"), "status": "past"}
+            for t in old_list
+        ]
+        rows.append({"obj": new_obj, "ts": new_ts, "status": "current"})
+        neo.query(cypher_status, {"subj": subj, "rows": rows})
         print("Conflict resolved: new fact current; old facts past.")
         return
 
     if choice == "B":
         print("Applying resolution B: keep both as current.")
-        for t in old_list:
-            o = t.get("obj")
-            ts = t.get("timestamp")
-            cypher = f"""
-            MATCH (a {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b {{id: $obj}})
-            SET r.status = 'current'
-            """
-            neo.query(cypher, {"subj": subj, "obj": o, "ts": ts})
-
-        cypher_new = f"""
-        MATCH (a {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b {{id: $obj}})
-        SET r.status = 'current'
-        """
-        neo.query(cypher_new, {"subj": subj, "obj": new_obj, "ts": new_ts})
+        rows = [
+            {"obj": t.get("obj"), "ts": t.get("timestamp"), "status": "current"}
+            for t in old_list
+        ]
+        rows.append({"obj": new_obj, "ts": new_ts, "status": "current"})
+        neo.query(cypher_status, {"subj": subj, "rows": rows})
         print("Conflict resolved: all facts kept current.")
         return
 
     if choice == "C":
         print("Applying resolution C: delete the new fact.")
-        cypher_del = f"""
-        MATCH (a {{id: $subj}})-[r:`{rel}` {{timestamp: $ts}}]->(b {{id: $obj}})
-        DELETE r
-        """
-        neo.query(cypher_del, {"subj": subj, "obj": new_obj, "ts": new_ts})
+        neo.query(_cypher_delete(rel), {"subj": subj, "obj": new_obj, "ts": new_ts})
+        forget_triplet(subj, rel, new_obj)
         print("Conflict resolved: new fact removed.")
         return
\ No newline at end of file
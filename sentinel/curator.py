@@ -1,11 +1,13 @@
-import json
-import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 
 from camel.agents import ChatAgent
 from camel.messages import BaseMessage
 
+from . import _jsonutil
+from .llm import warn_if_truncated
+from .utils import clean_str, to_confidence
+
 
 CURATOR_SYSTEM_PROMPT = r"""
 You are "Curator", a strict memory filter for a personal assistant.
@@ -124,35 +126,35 @@ Read the user's message and produce JSON in the exact schema.
 """
 
 
-@dataclass
-class CuratorResult:
-    clean_text: str
-    candidates: List[Dict[str, Any]]
-    notes: List[str]
+@dataclass(slots=True)
+class CuratorCandidate:
+    subj: str
+    rel: str
+    obj: str
+    confidence: float
 
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON form, as sent on to the Enricher."""
+        return {"subj": self.subj, "rel": self.rel, "obj": self.obj, "confidence": self.confidence}
 
-def _extract_json_object(text: str) -> Optional[str]:
-    if not text:
-        return None
-    t = text.strip()
-    if t.startswith("{") and t.endswith("}"):
-        return t
-    m = re.search(r"\{.*\}", text, flags=re.DOTALL)
-    return m.group(0).strip() if m else None
 
+@dataclass(slots=True)
+class CuratorResult:
+    clean_text: str
+    candidates: List[CuratorCandidate]
+    notes: List[str]
 
-def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
-    js = _extract_json_object(text)
-    if not js:
-        return None
-    try:
-        obj = json.loads(js)
-        return obj if isinstance(obj, dict) else None
-    except Exception:
-        return None
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON form in the Curator's own schema; _result_from_data reads it back."""
+        return {
+            "clean_text": self.clean_text,
+            "candidates": [c.as_dict() for c in self.candidates],
+            "notes": list(self.notes),
+        }
 
 
 def make_curator_agent(model) -> ChatAgent:
+    """Build the Curator agent. main() makes one per session and reuses it."""
     system_msg = BaseMessage.make_assistant_message(
         role_name="Curator",
         content=CURATOR_SYSTEM_PROMPT,
@@ -166,10 +168,14 @@ def run_curator(curator_agent: ChatAgent, user_text: str) -> CuratorResult:
         f"{user_text}\n\n"
         "Return JSON only following the schema."
     )
+    # Each turn is independent; resetting keeps the request to the system
+    # prompt plus this message, a prefix Ollama can reuse from its KV cache.
+    curator_agent.reset()
     resp = curator_agent.step(prompt)
     raw = resp.msg.content if resp and resp.msg else ""
+    warn_if_truncated(resp, "Curator")
 
-    obj = _safe_json_parse(raw)
+    obj = _jsonutil.parse_json_object(raw, keys=("clean_text", "candidates", "notes"))
     if not obj:
         # Hard fallback: return empty rather than hallucinate
         return CuratorResult(
@@ -178,7 +184,11 @@ def run_curator(curator_agent: ChatAgent, user_text: str) -> CuratorResult:
             notes=["Curator output was not valid JSON; stored nothing."],
         )
 
-    clean_text = str(obj.get("clean_text", "") or "").strip()
+    return _result_from_data(obj)
+
+
+def _result_from_data(obj: Dict[str, Any]) -> CuratorResult:
+    clean_text = clean_str(obj.get("clean_text", "") or "")
     candidates = obj.get("candidates", []) or []
     notes = obj.get("notes", []) or []
 
@@ -187,23 +197,19 @@ def run_curator(curator_agent: ChatAgent, user_text: str) -> CuratorResult:
     if not isinstance(notes, list):
         notes = []
 
-    # Normalize candidate dicts
-    norm_cands: List[Dict[str, Any]] = []
+    # Normalize candidate dicts into records once, at parse time
+    norm_cands: List[CuratorCandidate] = []
     for c in candidates:
         if not isinstance(c, dict):
             continue
-        subj = str(c.get("subj", "USER")).strip() or "USER"
-        rel = str(c.get("rel", "FACT")).strip()
-        objv = str(c.get("obj", "")).strip()
+        subj = clean_str(c.get("subj", "USER"), "USER")
+        rel = clean_str(c.get("rel", "FACT"))
+        objv = clean_str(c.get("obj", ""))
         if not rel or not objv:
             continue
-        try:
-            conf = float(c.get("confidence", 0.8))
-        except Exception:
-            conf = 0.8
-        conf = max(0.0, min(conf, 1.0))
-        norm_cands.append({"subj": subj, "rel": rel, "obj": objv, "confidence": conf})
+        conf = to_confidence(c.get("confidence", 0.8))
+        norm_cands.append(CuratorCandidate(subj=subj, rel=rel, obj=objv, confidence=conf))
 
     norm_notes = [str(n) for n in notes if str(n).strip()]
 
-    return CuratorResult(clean_text=clean_text, candidates=norm_cands, notes=norm_notes)
\ No newline at end of file
+    return CuratorResult(clean_text=clean_text, candidates=norm_cands, notes=norm_notes)
@@ -0,0 +1,80 @@
+"""
+Curator and Enricher in one model call: the reply carries the Curator's
+clean_text/candidates and the Enricher's relations together, so a turn pays
+for one prefill and one decode instead of two.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from camel.agents import ChatAgent
+from camel.messages import BaseMessage
+
+from . import _jsonutil
+from .curator import CURATOR_SYSTEM_PROMPT, CuratorResult
+from .curator import _result_from_data as _curator_result_from_data
+from .enricher import ENRICHER_SYSTEM_PROMPT, EnricherResult
+from .enricher import _result_from_data as _enricher_result_from_data
+from .llm_cache import cached_step, scope_for
+
+CURATOR_ENRICHER_SYSTEM_PROMPT = (
+    "You perform two stages in a single reply.\n\n"
+    "=== STAGE 1: CURATOR ===\n"
+    f"{CURATOR_SYSTEM_PROMPT}\n"
+    "=== STAGE 2: ENRICHER ===\n"
+    "The Enricher's input is your own Stage 1 clean_text and candidates.\n"
+    f"{ENRICHER_SYSTEM_PROMPT}\n"
+    "=== FINAL OUTPUT ===\n"
+    "Ignore the per-stage output instructions above and return ONE JSON object "
+    "only, no markdown:\n"
+    "{\n"
+    '  "clean_text": "string",\n'
+    '  "candidates": [{"subj":"USER","rel":"REL","obj":"OBJ","confidence":0.0-1.0}],\n'
+    '  "relations": [{"subj":"USER|string","rel":"string","obj":"string","confidence":0.0-1.0,"derived":true}],\n'
+    '  "notes": ["string"]\n'
+    "}\n"
+    "If nothing is memory-worthy, candidates and relations are both empty lists."
+)
+
+_CACHE_SCOPE = scope_for("curator_enricher", CURATOR_ENRICHER_SYSTEM_PROMPT)
+
+
+def make_curator_enricher_agent(model) -> ChatAgent:
+    system_msg = BaseMessage.make_assistant_message(
+        role_name="CuratorEnricher",
+        content=CURATOR_ENRICHER_SYSTEM_PROMPT,
+    )
+    return ChatAgent(system_message=system_msg, model=model)
+
+
+def _parse_reply(raw: str) -> Optional[Dict[str, Any]]:
+    """The reply's JSON if it follows the combined schema, else None."""
+    data = _jsonutil.parse_json_object(
+        raw, keys=("clean_text", "candidates", "relations", "notes")
+    )
+    if not data or "candidates" not in data or "relations" not in data:
+        return None
+    if not isinstance(data["candidates"], list) or not isinstance(data["relations"], list):
+        return None
+    return data
+
+
+def run_curator_enricher(
+    agent: ChatAgent,
+    user_text: str,
+) -> Optional[Tuple[CuratorResult, EnricherResult]]:
+    """
+    Both results from one call, or None if the reply does not follow the
+    combined schema (callers then fall back to run_curator + run_enricher).
+    """
+    prompt = (
+        "User message:\n"
+        f"{user_text}\n\n"
+        "Return JSON only following the final output schema."
+    )
+    agent.reset()  # stateless task: system prompt + this message only
+    raw = cached_step(agent, _CACHE_SCOPE, prompt, validate=lambda r: _parse_reply(r) is not None)
+
+    data = _parse_reply(raw)
+    if data is None:
+        return None
+    return _curator_result_from_data(data), _enricher_result_from_data(data)
\ No newline at end of file
@@ -1,12 +1,14 @@
-import json
-import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from camel.agents import ChatAgent
 from camel.messages import BaseMessage
 
+from . import _jsonutil
+from .curator import CuratorCandidate, CuratorResult
 from .extract import Triplet, norm, normalize_relation
+from .llm_cache import cached_step, scope_for
+from .utils import clean_str, to_confidence
 
 
 ENRICHER_SYSTEM_PROMPT = r"""
@@ -56,26 +58,39 @@ RESEARCH_AREA, HAS_FIELD, HAS_BACKGROUND, LOCATED_IN
 """
 
 
-@dataclass(frozen=True)
+_ENRICHER_CACHE_SCOPE = scope_for("enricher", ENRICHER_SYSTEM_PROMPT)
+
+
+@dataclass(frozen=True, slots=True)
+class EnricherRelation:
+    subj: str
+    rel: str
+    obj: str
+    confidence: float
+    derived: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "subj": self.subj,
+            "rel": self.rel,
+            "obj": self.obj,
+            "confidence": self.confidence,
+            "derived": self.derived,
+        }
+
+
+@dataclass(frozen=True, slots=True)
 class EnricherResult:
-    relations: List[Dict[str, Any]]
+    relations: List[EnricherRelation]
     notes: List[str]
 
-
-def _extract_json(text: str) -> Optional[Dict[str, Any]]:
-    if not text:
-        return None
-    m = re.search(r"\{.*\}", text, flags=re.DOTALL)
-    if not m:
-        return None
-    try:
-        obj = json.loads(m.group(0))
-        return obj if isinstance(obj, dict) else None
-    except Exception:
-        return None
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON form in the Enricher's own schema; _result_from_data reads it back."""
+        return {"relations": [r.as_dict() for r in self.relations], "notes": list(self.notes)}
 
 
 def make_enricher_agent(model) -> ChatAgent:
+    """Callers should keep the returned agent rather than rebuilding it per turn."""
     system_msg = BaseMessage.make_assistant_message(
         role_name="Enricher",
         content=ENRICHER_SYSTEM_PROMPT,
@@ -86,51 +101,64 @@ def make_enricher_agent(model) -> ChatAgent:
 def run_enricher(
     agent: ChatAgent,
     clean_text: str,
-    candidates: List[Dict[str, Any]],
+    candidates: List[CuratorCandidate],
 ) -> EnricherResult:
+    prompt = _enricher_prompt(clean_text, candidates)
+
+    agent.reset()  # stateless task: system prompt + this input only
+    raw = cached_step(
+        agent, _ENRICHER_CACHE_SCOPE, prompt, validate=lambda r: _parse_reply(r) is not None
+    )
+    data = _parse_reply(raw)
+
+    if not data:
+        return EnricherResult(relations=[], notes=["Invalid JSON from Enricher."])
+
+    return _result_from_data(data)
+
+
+def _parse_reply(raw: str) -> Optional[Dict[str, Any]]:
+    return _jsonutil.parse_json_object(raw, keys=("relations", "notes"))
+
+
+def _enricher_prompt(clean_text: str, candidates: List[CuratorCandidate]) -> str:
     payload = {
         "clean_text": clean_text,
-        "candidates": candidates or [],
+        "candidates": [c.as_dict() for c in candidates or []],
     }
-
-    prompt = (
+    return (
         "Input:\n"
-        f"{json.dumps(payload, ensure_ascii=False)}\n\n"
+        f"{_jsonutil.dumps(payload)}\n\n"
         "Return JSON in the required schema only."
     )
 
-    resp = agent.step(prompt)
-    raw = resp.msg.content if resp and resp.msg else ""
-    data = _extract_json(raw)
 
-    if not data:
-        return EnricherResult(relations=[], notes=["Invalid JSON from Enricher."])
+def _clean_relation(r: Any) -> Optional[EnricherRelation]:
+    if not isinstance(r, dict):
+        return None
+    subj = clean_str(r.get("subj", ""))
+    rel = clean_str(r.get("rel", ""))
+    obj = clean_str(r.get("obj", ""))
+    if not subj or not rel or not obj:
+        return None
+    return EnricherRelation(
+        subj=subj,
+        rel=rel,
+        obj=obj,
+        confidence=to_confidence(r.get("confidence", 0.8)),
+        derived=bool(r.get("derived", True)),
+    )
+
 
+def _result_from_data(data: Dict[str, Any]) -> EnricherResult:
     relations = data.get("relations", []) or []
     notes = data.get("notes", []) or []
 
-    clean_relations: List[Dict[str, Any]] = []
+    clean_relations: List[EnricherRelation] = []
     for r in relations:
-        if not isinstance(r, dict):
-            continue
-        subj = str(r.get("subj", "")).strip()
-        rel = str(r.get("rel", "")).strip()
-        obj = str(r.get("obj", "")).strip()
-        if not subj or not rel or not obj:
-            continue
-        try:
-            conf = float(r.get("confidence", 0.8))
-        except Exception:
-            conf = 0.8
-        clean_relations.append(
-            {
-                "subj": subj,
-                "rel": rel,
-                "obj": obj,
-                "confidence": max(0.0, min(conf, 1.0)),
-                "derived": bool(r.get("derived", True)),
-            }
-        )
+        c = _clean_relation(r)
+        if c is not None:
+            clean_relations.append(c)
 
     return EnricherResult(relations=clean_relations, notes=[str(n) for n in notes])
 
@@ -164,23 +192,35 @@ def _split_field_list(text: str) -> List[str]:
     t = (text or "").strip()
     if not t:
         return []
-    t = t.replace(" & ", " and ")
-    t = t.replace(", and ", ", ")
-    parts = []
+    t = t.replace(" & ", " and ").replace(", and ", ", ")
+    parts: List[str] = []
     for chunk in t.split(","):
         chunk = chunk.strip()
-        if not chunk:
-            continue
-        # Further split "A and B" if present
         if " and " in chunk:
-            subparts = [p.strip() for p in chunk.split(" and ") if p.strip()]
-            parts.extend(subparts)
+            # Further split "A and B"
+            parts.extend(p.strip() for p in chunk.split(" and "))
         else:
             parts.append(chunk)
-    # Dedup preserve order
+    return _dedup_fields(parts)
+
+
+def _needs_resplit(field: str) -> bool:
+    """Whether splitting a ", "-joined list would break this field up or change it."""
+    return (
+        "," in field
+        or " and " in field
+        or " & " in field
+        or field.startswith(("and ", "& "))
+    )
+
+
+def _dedup_fields(fields: Iterable[str]) -> List[str]:
+    """Case-insensitive dedup, preserving order and dropping empties."""
     seen = set()
     out = []
-    for p in parts:
+    for p in fields:
+        if not p:
+            continue
         key = p.lower()
         if key in seen:
             continue
@@ -201,17 +241,26 @@ def build_triplets_from_enricher(
     """
     user_node = norm(user_canonical_id)
 
-    # 1) Read relations and collect program + fields first
+    # Deduplicate (an insertion-ordered dict) and drop the trivial NAME
+    # self-loop as triplets are produced
+    seen: Dict[Triplet, None] = {}
+    seen_setdefault = seen.setdefault
+
+    def emit(t: Triplet) -> None:
+        if t.rel == "NAME" and t.subj == t.obj:
+            return
+        seen_setdefault(t, None)
+
+    # 1) Single pass over relations: store plain relations immediately,
+    #    collect program + fields to attach at the end
     degree_program: Optional[str] = None
     collected_fields: List[str] = []
 
-    # We also keep “raw triplets” temporarily for relations we will store as-is
-    raw_pairs: List[Tuple[str, str, str]] = []
-
     for r in enricher.relations:
-        subj_raw = str(r.get("subj", "USER")).strip()
-        rel_raw = str(r.get("rel", "")).strip()
-        obj_raw = str(r.get("obj", "")).strip()
+        # Already cleaned by _clean_relation
+        subj_raw = r.subj
+        rel_raw = r.rel
+        obj_raw = r.obj
 
         if not rel_raw or not obj_raw:
             continue
@@ -239,14 +288,7 @@ def build_triplets_from_enricher(
             collected_fields.append(obj_raw)
             continue
 
-        # Everything else store later
-        raw_pairs.append((subj, rel, obj_raw))
-
-    # 2) Build final triplets
-    out: List[Triplet] = []
-
-    # 2a) Store place relations with splitting
-    for subj, rel, obj_raw in raw_pairs:
+        # Place relations with splitting
         if rel in _PLACE_RELS:
             split = _split_city_country(obj_raw)
             if split:
@@ -255,43 +297,61 @@ def build_triplets_from_enricher(
                 country_id = norm(country)
 
                 # USER -> City (not City__Country)
-                out.append(Triplet(subj=subj, rel=rel, obj=city_id))
+                emit(Triplet(subj=subj, rel=rel, obj=city_id))
 
                 # City -> Country
-                out.append(Triplet(subj=city_id, rel="LOCATED_IN", obj=country_id))
+                emit(Triplet(subj=city_id, rel="LOCATED_IN", obj=country_id))
                 continue
 
         # default: store as-is (no splitting!)
-        out.append(Triplet(subj=subj, rel=rel, obj=norm(obj_raw)))
+        emit(Triplet(subj=subj, rel=rel, obj=norm(obj_raw)))
 
-    # 2b) Program + fields normalization
+    # 2) Program + fields normalization
     if degree_program:
         program_node = norm(degree_program)
-        out.append(Triplet(subj=user_node, rel="HAS_PROGRAM", obj=program_node))
+        emit(Triplet(subj=user_node, rel="HAS_PROGRAM", obj=program_node))
 
         # Attach fields under program
-        for f in _split_field_list(", ".join(collected_fields)) if len(collected_fields) > 1 else collected_fields:
+        if len(collected_fields) <= 1:
+            fields = collected_fields
+        elif any(map(_needs_resplit, collected_fields)):
+            # Only re-split the joined list when that can change it
+            fields = _split_field_list(", ".join(collected_fields))
+        else:
+            fields = _dedup_fields(collected_fields)
+        for f in fields:
             f = (f or "").strip()
             if not f:
                 continue
-            out.append(Triplet(subj=program_node, rel="HAS_FIELD", obj=norm(f)))
+            emit(Triplet(subj=program_node, rel="HAS_FIELD", obj=norm(f)))
     else:
         # No program found, keep fields directly under user (still useful)
         for f in collected_fields:
             f = (f or "").strip()
             if not f:
                 continue
-            out.append(Triplet(subj=user_node, rel="RESEARCH_AREA", obj=norm(f)))
+            emit(Triplet(subj=user_node, rel="RESEARCH_AREA", obj=norm(f)))
+
+    return list(seen)
 
-    # 3) Deduplicate preserve order and avoid trivial NAME self-loop
-    seen = set()
-    deduped: List[Triplet] = []
-    for t in out:
-        if t.rel == "NAME" and t.subj == t.obj:
-            continue
-        if t in seen:
-            continue
-        seen.add(t)
-        deduped.append(t)
 
-    return deduped
\ No newline at end of file
+def triplets_for_turn(
+    curator_result: CuratorResult,
+    enricher_result: Optional[EnricherResult],
+    user_canonical_id: str,
+) -> List[Triplet]:
+    """Enricher triplets, or the Curator candidates stored flat if it produced none."""
+    triplets: List[Triplet] = []
+    if enricher_result is not None:
+        triplets = build_triplets_from_enricher(
+            enricher_result,
+            user_canonical_id=user_canonical_id,
+        )
+    if triplets:
+        return triplets
+
+    for c in curator_result.candidates:
+        # Already cleaned by the Curator; rel and obj are never empty
+        subj = user_canonical_id if c.subj.upper() == "USER" else c.subj
+        triplets.append(Triplet(subj=norm(subj), rel=normalize_relation(c.rel), obj=norm(c.obj)))
+    return triplets
\ No newline at end of file
@@ -1,13 +1,22 @@
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 import re
+import sys
 
 from camel.agents import KnowledgeGraphAgent
 from camel.loaders import UnstructuredIO
 from camel.storages import Neo4jGraph
 
+from .kg_store import upsert_triplets_batch
 from .utils import norm
 
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_NONALNUM_RE = re.compile(r"[^a-z0-9]+")
+_WS_RE = re.compile(r"\s+")
+# Runs of anything str.isalnum() rejects, underscores included.
+_REL_SEP_RE = re.compile(r"[\W_]+")
+
 @dataclass(frozen=True)
 class Triplet:
     subj: str
@@ -31,6 +40,8 @@ def extract_relationships(
     return graph_element.relationships
 
 
+# Pure and called per relation with few distinct inputs; cache_clear() resets.
+@lru_cache(maxsize=4096)
 def normalize_relation(rel_type: str) -> str:
     """Canonicalize relation type into Neo4j-friendly UPPER_SNAKE_CASE."""
     r = (rel_type or "").strip()
@@ -38,15 +49,14 @@ def normalize_relation(rel_type: str) -> str:
         return "RELATED_TO"
 
     # Turn camelCase / PascalCase into snake_case first: StudiesIn -> Studies_In
-    r = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", r)
-
-    # Now normalize to uppercase snake-like format
-    r = "".join(ch if ch.isalnum() else "_" for ch in r).upper()
-    while "__" in r:
-        r = r.replace("__", "_")
+    r = _CAMEL_RE.sub(r"\1_\2", r)
 
-    r = r.strip("_")
-    return r or "RELATED_TO"
+    # Now normalize to uppercase snake-like format; each separator run
+    # collapses to a single "_" in the same pass
+    r = _REL_SEP_RE.sub("_", r).upper().strip("_")
+    # Only a few dozen relation types exist; interned, they hash once and
+    # compare by identity in the dedup dicts and conflict lookups.
+    return sys.intern(r) if r else "RELATED_TO"
 
 
 def is_garbage_node(x: str) -> bool:
@@ -59,24 +69,21 @@ def is_garbage_node(x: str) -> bool:
     return x.strip().upper() in bad
 
 
-_USER_REF_PATTERNS = [
-    r"^i$",
-    r"^me$",
-    r"^my$",
-    r"^myself$",
-    r"^user$",
-    r"^the\s*user$",
-    r"^speaker$",
-    r"^the\s*speaker$",
-]
+# Normalized surfaces (see _normalize_surface) that mean the human user.
+_USER_REFS = frozenset({
+    "i", "me", "my", "myself",
+    "user", "the user", "theuser",
+    "speaker", "the speaker", "thespeaker",
+})
 
 
+@lru_cache(maxsize=4096)
 def _normalize_surface(text: str) -> str:
     """Normalize raw ids/surface forms for matching (not for storage)."""
     t = (text or "").strip().lower()
     # Treat underscores and punctuation like spaces for matching.
-    t = re.sub(r"[^a-z0-9]+", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _NONALNUM_RE.sub(" ", t)
+    t = _WS_RE.sub(" ", t).strip()
     return t
 
 
@@ -85,17 +92,15 @@ def is_user_reference(raw_subj_id: str) -> bool:
     s = _normalize_surface(raw_subj_id)
     if not s:
         return True
-    for pat in _USER_REF_PATTERNS:
-        if re.match(pat, s):
-            return True
-    return False
+    return s in _USER_REFS
 
 
 def to_triplets(
     relationships,
     user_canonical_id: str,
 ) -> List[Triplet]:
-    out: List[Triplet] = []
+    # Deduplicate within a turn as we go; dict keys keep insertion order
+    seen: Dict[Triplet, None] = {}
 
     for rel in relationships:
         s_raw = (rel.subj.id or "user").strip()
@@ -118,17 +123,9 @@ def to_triplets(
         if s_id == o_id:
             continue
 
-        out.append(Triplet(subj=s_id, rel=rel_type, obj=o_id))
+        seen.setdefault(Triplet(subj=s_id, rel=rel_type, obj=o_id), None)
 
-    # Deduplicate within a turn (preserve order)
-    seen = set()
-    deduped: List[Triplet] = []
-    for t in out:
-        if t in seen:
-            continue
-        seen.add(t)
-        deduped.append(t)
-    return deduped
+    return list(seen)
 
 
 def store_triplets(
@@ -136,8 +133,9 @@ def store_triplets(
     triplets: Iterable[Triplet],
     timestamp: str,
 ) -> List[Tuple[str, str, str]]:
-    stored = []
-    for t in triplets:
-        neo.add_triplet(subj=t.subj, obj=t.obj, rel=t.rel, timestamp=timestamp)
-        stored.append((t.subj, t.rel, t.obj))
-    return stored
\ No newline at end of file
+    """Write the triplets not already in the graph; returns what was written."""
+    triplets = list(triplets)
+    if not triplets:
+        return []
+    # MERGE reports which rows it created, so no separate existence probe
+    return upsert_triplets_batch(neo, triplets, timestamp)
\ No newline at end of file
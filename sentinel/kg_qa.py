@@ -1,15 +1,27 @@
-from typing import Optional
-
-from camel.agents import ChatAgent
-from camel.messages import BaseMessage
 from camel.storages import Neo4jGraph
 
-from .kg_store import get_all_triplets
-from .utils import detect_time_window, parse_iso_ts
+from .kg_store import get_recent_triplets
+from .llm import pooled_agent
+from .llm_cache import cached_step, scope_for
+from .utils import detect_time_window
 
 from .config import load_user_canonical_id
 user_canonical_id = load_user_canonical_id()
 
+KG_QA_SYSTEM_PROMPT = (
+    "You are an assistant that answers questions using ONLY the provided "
+    "memory log, which is a list of time-stamped facts in the form:\n"
+    "[timestamp] subject -[relation]-> object\n\n"
+    f"The human user's canonical id is '{user_canonical_id}'. Any facts about '{user_canonical_id}' refer to the human user.\n\n"
+    "Very important identity rule:\n"
+    "- Any subject named 'user', 'I', 'you', 'speaker', or similar "
+    "refers to the SAME real-world person: the human user.\n"
+    "- That person is NOT you. You are a separate AI assistant.\n\n"
+    "When you answer, describe what the user told you in the second person.\n"
+    "You must not invent facts that are not logically supported by this log. "
+    "If the answer cannot be determined, say you are not sure."
+)
+
 
 def run_kg_qa(
     neo: Neo4jGraph,
@@ -17,55 +29,31 @@ def run_kg_qa(
     question: str,
     max_records: int = 50,
 ) -> str:
-    triplets = get_all_triplets(neo)
-    if not triplets:
-        return "I do not have any stored memories yet."
-
     window = detect_time_window(question)
+    triplets = []
     if window is not None:
         start_w, end_w = window
-        filtered = []
-        for t in triplets:
-            ts = t.get("timestamp")
-            dt = parse_iso_ts(ts) if ts else None
-            if dt is not None and start_w <= dt <= end_w:
-                filtered.append(t)
-        if filtered:
-            triplets = filtered
-
-    triplets_sorted = sorted(triplets, key=lambda t: t.get("timestamp", ""))
-
-    if len(triplets_sorted) > max_records:
-        triplets_sorted = triplets_sorted[-max_records:]
-
-    memory_lines = []
-    for t in triplets_sorted:
-        ts = t.get("timestamp", "no-time")
-        s = t.get("subj")
-        r = t.get("rel")
-        o = t.get("obj")
-        memory_lines.append(f"[{ts}] {s} -[{r}]-> {o}")
+        triplets = get_recent_triplets(
+            neo,
+            max_records,
+            start=start_w.isoformat(timespec="seconds"),
+            end=end_w.isoformat(timespec="seconds"),
+        )
+    if not triplets:
+        # No window, or nothing inside it: answer from the latest memories.
+        triplets = get_recent_triplets(neo, max_records)
+    if not triplets:
+        return "I do not have any stored memories yet."
 
-    memory_block = "\n".join(memory_lines)
+    # Newest-first from Neo4j; the log reads oldest-first.
+    triplets_sorted = triplets[::-1]
 
-    system_msg = BaseMessage.make_assistant_message(
-    role_name="KGMemoryAnswerAgent",
-    content=(
-        "You are an assistant that answers questions using ONLY the provided "
-        "memory log, which is a list of time-stamped facts in the form:\n"
-        "[timestamp] subject -[relation]-> object\n\n"
-        f"The human user's canonical id is '{user_canonical_id}'. Any facts about '{user_canonical_id}' refer to the human user.\n\n"
-        "Very important identity rule:\n"
-        "- Any subject named 'user', 'I', 'you', 'speaker', or similar "
-        "refers to the SAME real-world person: the human user.\n"
-        "- That person is NOT you. You are a separate AI assistant.\n\n"
-        "When you answer, describe what the user told you in the second person.\n"
-        "You must not invent facts that are not logically supported by this log. "
-        "If the answer cannot be determined, say you are not sure."
-        ),
+    memory_block = "\n".join(
+        f"[{t.get('timestamp', 'no-time')}] {t.get('subj')} -[{t.get('rel')}]-> {t.get('obj')}"
+        for t in triplets_sorted
     )
 
-    kg_qa_agent = ChatAgent(system_message=system_msg, model=base_model)
+    kg_qa_agent = pooled_agent("KGMemoryAnswerAgent", KG_QA_SYSTEM_PROMPT, base_model)
 
     prompt = (
         "Here is the memory log:\n"
@@ -76,5 +64,8 @@ def run_kg_qa(
         "Answer based ONLY on the memory log above."
     )
 
-    resp = kg_qa_agent.step(prompt)
-    return resp.msg.content
\ No newline at end of file
+    # Scoped to this exact memory log, so any KG change invalidates cached
+    # answers. Exact-match only: a similar question about another entity,
+    # date or number must not get this one's answer.
+    scope = scope_for("kg_qa", KG_QA_SYSTEM_PROMPT, memory_block)
+    return cached_step(kg_qa_agent, scope, prompt)
\ No newline at end of file
@@ -1,9 +1,115 @@
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from camel.storages import Neo4jGraph
 
 from .config import load_neo4j_config
 
+# Label camel's Neo4jGraph.add_triplet puts on every node it merges.
+ENTITY_LABEL = "Entity"
+
+MIRROR_SIZE = 50_000
+
+# (subj, rel, obj) triplets known to be stored, so repeats skip the write
+# round-trip. An LRU of MIRROR_SIZE keys: filled on write, trimmed on delete;
+# an evicted triplet is just sent to Neo4j again.
+_SEEN: OrderedDict[Tuple[str, str, str], None] = OrderedDict()
+
+
+def _mark_seen(keys: Iterable[Tuple[str, str, str]]) -> None:
+    for key in keys:
+        _SEEN[key] = None
+        _SEEN.move_to_end(key)
+    while len(_SEEN) > MIRROR_SIZE:
+        _SEEN.popitem(last=False)
+
+
+class TripletMirror:
+    """
+    In-process (subj, rel) -> [(obj, timestamp)] copy of recently written facts,
+    LRU-bounded, so hot reads are dict probes instead of round-trips. Neo4j
+    stays authoritative: a key is only mirrored once its full object list is
+    known, and get() returns None whenever the answer has to come from Neo4j.
+    """
+
+    def __init__(self, maxsize: int = MIRROR_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Tuple[str, str], List[Tuple[str, Optional[str]]]] = OrderedDict()
+        # Relation types for which every stored (subj, rel) is mirrored, so a
+        # missing key means nothing is stored. _complete_all after a wipe.
+        self._complete_rels: Set[str] = set()
+        self._complete_all = False
+        self._lock = threading.Lock()
+
+    def _is_complete(self, rel: str) -> bool:
+        return self._complete_all or rel in self._complete_rels
+
+    def set_on_write(self, subj: str, rel: str, obj: str, ts: Optional[str]) -> None:
+        key = (subj, rel)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if not self._is_complete(rel):
+                    return  # other objects may be stored: leave it to Neo4j
+                entry = self._entries[key] = []
+            else:
+                self._entries.move_to_end(key)
+            for i, (o, _) in enumerate(entry):
+                if o == obj:
+                    entry[i] = (obj, ts)
+                    break
+            else:
+                entry.append((obj, ts))
+            while len(self._entries) > self.maxsize:
+                (_, old_rel), _ = self._entries.popitem(last=False)
+                # An evicted key reads as a miss, not as "nothing stored".
+                self._complete_all = False
+                self._complete_rels.discard(old_rel)
+
+    def get(self, subj: str, rel: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """The stored (obj, timestamp) pairs for (subj, rel), or None if unknown."""
+        key = (subj, rel)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return list(entry)
+            return [] if self._is_complete(rel) else None
+
+    def discard(self, subj: str, rel: str, obj: str) -> None:
+        key = (subj, rel)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[:] = [(o, ts) for o, ts in entry if o != obj]
+
+    def load(self, rows: Iterable[Dict], rels: Iterable[str]) -> None:
+        """Replace the mirror with every stored triplet of the given relation types."""
+        with self._lock:
+            self._entries.clear()
+            self._complete_all = False
+            self._complete_rels = set(rels)
+        for row in rows:
+            self.set_on_write(row["subj"], row["rel"], row["obj"], row.get("timestamp"))
+
+    def clear(self) -> None:
+        """Call after the graph is wiped: nothing is stored any more."""
+        with self._lock:
+            self._entries.clear()
+            self._complete_rels = set()
+            self._complete_all = True
+
+
+MIRROR = TripletMirror()
+
+
+def forget_triplet(subj: str, rel: str, obj: str) -> None:
+    """Call after deleting a triplet outside this module."""
+    _SEEN.pop((subj, rel, obj), None)
+    MIRROR.discard(subj, rel, obj)
+
 
 def connect_neo4j(clear: bool = False) -> Neo4jGraph:
     cfg = load_neo4j_config()
@@ -25,75 +131,181 @@ def connect_neo4j(clear: bool = False) -> Neo4jGraph:
     if clear:
         print("[KG] Erasing entire knowledge graph...")
         neo.query("MATCH (n) DETACH DELETE n")
+        _SEEN.clear()
+        MIRROR.clear()
         print("[KG] Knowledge graph erased.")
 
+    _ensure_schema(neo)
+    if not clear:
+        # A freshly wiped graph has nothing worth pulling into the page cache.
+        _warm_page_cache(neo)
     return neo
 
 
-def get_all_triplets(neo: Neo4jGraph) -> List[Dict]:
-    return neo.get_triplet()
+def _ensure_schema(neo: Neo4jGraph) -> None:
+    """Make sure id lookups and conflict (timestamp) matches are index-backed."""
+    from .conflicts import SINGLE_VALUED_RELATIONS
+
+    statements = [
+        f"""
+        CREATE CONSTRAINT entity_id IF NOT EXISTS
+        FOR (n:{ENTITY_LABEL}) REQUIRE n.id IS UNIQUE
+        """
+    ]
+    for rel in sorted(SINGLE_VALUED_RELATIONS):
+        statements.append(
+            f"""
+            CREATE INDEX {rel.lower()}_timestamp IF NOT EXISTS
+            FOR ()-[r:`{rel}`]-() ON (r.timestamp)
+            """
+        )
+
+    for cypher in statements:
+        try:
+            neo.query(cypher)
+        except Exception as e:
+            print(f"[WARN] Could not create index/constraint: {e}")
+
+
+def _warm_page_cache(neo: Neo4jGraph) -> None:
+    """Touch the graph once so the first real query does not hit a cold cache."""
+    try:
+        neo.query("CALL apoc.warmup.run(true, true, true)")
+        return
+    except Exception:
+        pass  # APOC missing (or warmup removed, as in APOC 5)
+    try:
+        neo.query(f"MATCH (n:{ENTITY_LABEL})-[r]->() RETURN count(r) AS c")
+    except Exception as e:
+        print(f"[WARN] Could not warm Neo4j page cache: {e}")
+
+
+def get_recent_triplets(
+    neo: Neo4jGraph,
+    limit: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Newest-first triplets, at most limit of them, optionally restricted to
+    timestamps within [start, end] (naive ISO strings, compared to the second).
+    Filtering, sorting and the limit all run in Neo4j.
+    """
+    cypher = f"""
+    MATCH (a:{ENTITY_LABEL})-[r]->(b:{ENTITY_LABEL})
+    WHERE ($start IS NULL OR left(r.timestamp, 19) >= $start)
+      AND ($end IS NULL OR left(r.timestamp, 19) <= $end)
+    RETURN a.id AS subj, type(r) AS rel, b.id AS obj, r.timestamp AS timestamp
+    ORDER BY coalesce(r.timestamp, '') DESC
+    LIMIT $limit
+    """
+    params = {"start": start, "end": end, "limit": int(limit)}
+    return neo.query(cypher, params) or []
+
+
+def upsert_triplets_batch(
+    neo: Neo4jGraph,
+    triplets: Iterable,
+    timestamp: str,
+) -> List[Tuple[str, str, str]]:
+    """
+    MERGE every triplet, stamping only the ones that did not exist yet, with one
+    UNWIND per relation type. Returns the newly created (subj, rel, obj) keys in
+    input order; existing triplets are left untouched.
+    """
+    # Duplicate rows in one statement could both report themselves as new.
+    keys = list(dict.fromkeys((t.subj, t.rel, t.obj) for t in triplets))
+    # Already known to exist: nothing to create, so not sent at all.
+    pending: List[Tuple[str, str, str]] = []
+    for k in keys:
+        if k in _SEEN:
+            _SEEN.move_to_end(k)
+        else:
+            pending.append(k)
+    by_rel: Dict[str, List[Dict]] = {}
+    for subj, rel, obj in pending:
+        by_rel.setdefault(rel, []).append({"subj": subj, "obj": obj})
+
+    created: Set[Tuple[str, str, str]] = set()
+    for rel, rows in by_rel.items():
+        for row in neo.query(_cypher_upsert_batch(rel), {"rows": rows, "ts": timestamp}) or []:
+            if row.get("created"):
+                created.add((row["subj"], rel, row["obj"]))
+    _mark_seen(pending)
+    new_keys = [k for k in pending if k in created]
+    for subj, rel, obj in new_keys:
+        MIRROR.set_on_write(subj, rel, obj, timestamp)
+    return new_keys
+
+
+@lru_cache(maxsize=64)
+def _cypher_upsert_batch(rel: str) -> str:
+    return f"""
+    UNWIND $rows AS row
+    MERGE (a:{ENTITY_LABEL} {{id: row.subj}})
+    MERGE (b:{ENTITY_LABEL} {{id: row.obj}})
+    WITH a, b, row
+    OPTIONAL MATCH (a)-[old:`{rel}`]->(b)
+    WITH a, b, row, count(old) = 0 AS created
+    MERGE (a)-[r:`{rel}`]->(b)
+    ON CREATE SET r.timestamp = $ts
+    RETURN row.subj AS subj, row.obj AS obj, created
+    """
+
+
+def get_conflicting_triplets(neo: Neo4jGraph, subj: str, rel: str, obj: str) -> List[Dict]:
+    """
+    Return stored (subj)-[rel]->(x) triplets whose object differs from obj.
+    Filtering happens in Cypher so only the matching rows leave Neo4j.
+    """
+    return neo.query(_cypher_conflicts(rel), {"subj": subj, "obj": obj}) or []
+
+
+@lru_cache(maxsize=64)
+def _cypher_conflicts(rel: str) -> str:
+    return f"""
+    MATCH (a:{ENTITY_LABEL} {{id: $subj}})-[r:`{rel}`]->(b:{ENTITY_LABEL})
+    WHERE b.id <> $obj
+    RETURN a.id AS subj, type(r) AS rel, b.id AS obj, r.timestamp AS timestamp
+    """
 
 
 def show_recent_triplets(neo: Neo4jGraph, limit: int = 10) -> None:
-    triplets = get_all_triplets(neo)
+    triplets = get_recent_triplets(neo, limit)
     if not triplets:
         print("[KG] No memories stored yet.")
         return
 
-    triplets_sorted = sorted(
-        triplets,
-        key=lambda t: t.get("timestamp", ""),
-        reverse=True,
-    )
-
-    print(f"[KG] Showing {min(limit, len(triplets_sorted))} most recent memories:")
-    for i, t in enumerate(triplets_sorted[:limit], start=1):
+    print(f"[KG] Showing {len(triplets)} most recent memories:")
+    for i, t in enumerate(triplets, start=1):
         print(
             f"  {i}. [{t.get('timestamp', 'no-time')}] "
             f"{t.get('subj')} -[{t.get('rel')}]-> {t.get('obj')}"
         )
 
 
-def remove_knowledge(neo: Neo4jGraph, pattern: str) -> None:
-    pattern_l = pattern.lower()
-    triplets = get_all_triplets(neo)
-    to_delete = []
-
-    for t in triplets:
-        s = t.get("subj", "")
-        r = t.get("rel", "")
-        o = t.get("obj", "")
-        ts = t.get("timestamp", "")
-
-        if (pattern_l in s.lower()) or (pattern_l in r.lower()) or (pattern_l in o.lower()):
-            to_delete.append((s, r, o, ts))
+def remove_knowledge(neo: Neo4jGraph, pattern: str) -> int:
+    """Delete memories matching pattern; returns how many were removed."""
+    # Match and delete in one statement; rel types are never interpolated.
+    cypher = f"""
+    MATCH (a:{ENTITY_LABEL})-[r]->(b:{ENTITY_LABEL})
+    WHERE toLower(a.id) CONTAINS $p
+       OR toLower(b.id) CONTAINS $p
+       OR toLower(type(r)) CONTAINS $p
+    WITH r, a.id AS subj, type(r) AS rel, b.id AS obj, r.timestamp AS timestamp
+    LIMIT 10000
+    DELETE r
+    RETURN subj, rel, obj, timestamp
+    """
+    deleted = neo.query(cypher, {"p": pattern.lower()}) or []
+    for t in deleted:
+        forget_triplet(t.get("subj"), t.get("rel"), t.get("obj"))
 
-    if not to_delete:
+    if not deleted:
         print(f"[KG] No memories matched pattern: {pattern!r}")
-        return
+        return 0
 
-    print(f"[KG] Removing {len(to_delete)} memories matching {pattern!r}:")
-    for s, r, o, ts in to_delete:
-        print(f"  [{ts}] {s} -[{r}]-> {o}")
-        cypher = f"""
-        MATCH (a {{id: $subj}})-[rel:`{r}` {{timestamp: $ts}}]->(b {{id: $obj}})
-        DELETE rel
-        """
-        neo.query(cypher, {"subj": s, "obj": o, "ts": ts})
-
-
-def triplet_exists(neo: Neo4jGraph, subj: str, rel: str, obj: str) -> bool:
-    """
-    Check whether (subj)-[rel]->(obj) exists, without triggering Neo4j warnings
-    for unseen relationship types.
-    """
-    cypher = """
-    MATCH (a {id: $subj})-[r]->(b {id: $obj})
-    WHERE type(r) = $rel
-    RETURN count(r) AS c
-    """
-    rows = neo.query(cypher, {"subj": subj, "obj": obj, "rel": rel}) or []
-    try:
-        return (rows[0].get("c", 0) if rows else 0) > 0
-    except Exception:
-        return False
\ No newline at end of file
+    print(f"[KG] Removed {len(deleted)} memories matching {pattern!r}:")
+    for t in deleted:
+        print(f"  [{t.get('timestamp', '')}] {t.get('subj')} -[{t.get('rel')}]-> {t.get('obj')}")
+    return len(deleted)
\ No newline at end of file
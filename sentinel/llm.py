@@ -1,8 +1,50 @@
+import os
+from typing import Any, Dict, Tuple
+
+from camel.agents import ChatAgent
+from camel.messages import BaseMessage
 from camel.models import ModelFactory
 from camel.types import ModelPlatformType
 
 
-OLLAMA_MODEL = "qwen2.5:7b-instruct"
+# Override with SENTINEL_MODEL to pick another tag or precision.
+OLLAMA_MODEL = os.getenv("SENTINEL_MODEL", "qwen2.5:7b-instruct")
+# How long the model stays loaded between turns is the Ollama server's
+# OLLAMA_KEEP_ALIVE setting: CAMEL's /v1 calls cannot pass keep_alive, and each
+# call resets it to the server default.
+# OpenAI-style response_format; Ollama maps it to format="json".
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+
+# Keyed by (role, id(model)): camel model backends are not reliably hashable,
+# and the models live for the whole session.
+_agent_pool: Dict[Tuple[str, int], ChatAgent] = {}
+
+
+def pooled_agent(role_name: str, system_prompt: str, model) -> ChatAgent:
+    """
+    One reusable agent per role and model, reset so each call starts from the
+    system prompt alone (for one-shot tasks like conflict explanation or KG QA).
+    """
+    key = (role_name, id(model))
+    agent = _agent_pool.get(key)
+    if agent is None:
+        system_msg = BaseMessage.make_assistant_message(
+            role_name=role_name,
+            content=system_prompt,
+        )
+        agent = _agent_pool[key] = ChatAgent(system_message=system_msg, model=model)
+    agent.reset()
+    return agent
+
+
+def warn_if_truncated(resp: Any, role_name: str) -> bool:
+    """Log and return True when a reply stopped at its max_tokens cap."""
+    info = getattr(resp, "info", None) or {}
+    if "length" not in (info.get("termination_reasons") or []):
+        return False
+    print(f"[WARN] {role_name} reply hit max_tokens and may be truncated.")
+    return True
 
 
 def create_chat_model():
@@ -23,6 +65,8 @@ def create_curator_model():
         model_config_dict={
             "temperature": 0.05,
             "max_tokens": 900,
+            # Ollama's JSON mode: the sampler can only emit a JSON object
+            "response_format": JSON_OBJECT_FORMAT,
         },
     )
 
@@ -34,6 +78,21 @@ def create_enricher_model():
         model_type=OLLAMA_MODEL,
         model_config_dict={
             "temperature": 0.15,
+            # Replies that reach the cap are logged by warn_if_truncated.
             "max_tokens": 1200,
+            "response_format": JSON_OBJECT_FORMAT,
+        },
+    )
+
+
+def create_curator_enricher_model():
+    # One reply carries both the Curator and the Enricher output
+    return ModelFactory.create(
+        model_platform=ModelPlatformType.OLLAMA,
+        model_type=OLLAMA_MODEL,
+        model_config_dict={
+            "temperature": 0.05,
+            "max_tokens": 1600,
+            "response_format": JSON_OBJECT_FORMAT,
         },
     )
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Cache for raw LLM responses, keyed by an exact hash(model|scope|prompt) in
+SQLite. Near-duplicate prompts are deliberately not matched: one that differs
+in an entity, date or number would replay the wrong answer.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from camel.agents import ChatAgent
+
+from .config import CACHE_DIR
+from .llm import OLLAMA_MODEL, warn_if_truncated
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        path: Path = CACHE_DIR / "llm_cache.sqlite",
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Callers run on worker threads; access is locked.
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, response BLOB, ts REAL)"
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE ts < ?", (time.time() - self.ttl_seconds,)
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _key(scope: str, prompt: str) -> str:
+        data = f"{OLLAMA_MODEL}|{scope}|{prompt}".encode()
+        return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+    def get(self, scope: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT response, ts FROM llm_cache WHERE key = ?", (self._key(scope, prompt),)
+            ).fetchone()
+        if row is not None and time.time() - row[1] <= self.ttl_seconds:
+            return row[0].decode("utf-8")
+        return None
+
+    def put(self, scope: str, prompt: str, response: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, ts) VALUES (?, ?, ?)",
+                (self._key(scope, prompt), response.encode("utf-8"), time.time()),
+            )
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM llm_cache")
+            db.commit()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache; None when disabled with SENTINEL_LLM_CACHE=0."""
+    global _default_cache
+    if os.environ.get("SENTINEL_LLM_CACHE", "1") == "0":
+        return None
+    if _default_cache is None:
+        _default_cache = LLMResponseCache()
+    return _default_cache
+
+
+def clear_default_cache() -> None:
+    """Empty the on-disk cache, even when SENTINEL_LLM_CACHE=0 leaves it unused."""
+    (_default_cache or LLMResponseCache()).clear()
+
+
+def scope_for(*parts: str) -> str:
+    """Short stable scope id, e.g. from a name plus its system prompt."""
+    # Ask for the 8 bytes we keep instead of hashing 20 and slicing the hex.
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cached_step(
+    agent: ChatAgent,
+    scope: str,
+    prompt: str,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    agent.step(prompt).msg.content, served from the cache when possible. A
+    reply is only stored if validate(raw) accepts it (e.g. it parses) and it
+    was not cut off at max_tokens, so a bad one is retried instead of replayed.
+    """
+    cache = get_default_cache()
+    if cache is not None:
+        try:
+            hit = cache.get(scope, prompt)
+        except Exception as e:
+            print(f"[WARN] LLM cache lookup failed: {e}")
+            hit = None
+        if hit is not None:
+            return hit
+
+    resp = agent.step(prompt)
+    raw = resp.msg.content if resp and resp.msg else ""
+    truncated = warn_if_truncated(resp, getattr(agent, "role_name", "LLM"))
+
+    if cache is not None and raw and not truncated and (validate is None or validate(raw)):
+        try:
+            cache.put(scope, prompt, raw)
+        except Exception as e:
+            print(f"[WARN] LLM cache store failed: {e}")
+    return raw
@@ -1,105 +1,212 @@
+import asyncio
+import io
+import os
+import sys
+from dataclasses import dataclass
+from functools import cache, partial
+from typing import Callable, Dict, Optional
+
 from camel.agents import ChatAgent
 from camel.messages import BaseMessage
 
-from .commands import handle_kg_command
+from .cache_store import flush_store
+from .commands import handle_kg_command_async
 from .config import load_user_canonical_id
 from .conflicts import (
     detect_conflicts,
     xai_explain_conflict,
     interpret_conflict_choice,
     apply_conflict_resolution,
+    warm_known_facts,
+)
+from .curator import CuratorResult, make_curator_agent, run_curator
+from .curator_enricher import make_curator_enricher_agent, run_curator_enricher
+from .enricher import EnricherResult, make_enricher_agent, run_enricher, triplets_for_turn
+from .extract import make_timestamp, Triplet
+from .kg_store import connect_neo4j, upsert_triplets_batch
+from .llm import (
+    create_chat_model,
+    create_curator_enricher_model,
+    create_curator_model,
+    create_enricher_model,
 )
-from .curator import make_curator_agent, run_curator
-from .enricher import make_enricher_agent, run_enricher, build_triplets_from_enricher
-from .extract import make_timestamp, Triplet, norm, normalize_relation
-from .kg_store import connect_neo4j, triplet_exists
-from .llm import create_chat_model, create_curator_model, create_enricher_model
+from .semcache import cached_call, get_cache as get_semcache, remember
+from .utils import in_daemon_thread
 
 
-def _pretty_print_curator(curator_result):
+def _pretty_print_curator(curator_result, file=None):
     clean = curator_result.clean_text.strip()
     candidates = curator_result.candidates or []
     notes = curator_result.notes or []
 
-    print("[CURATOR] clean_text:", clean if clean else "(empty)")
+    print("[CURATOR] clean_text:", clean if clean else "(empty)", file=file)
 
     if candidates:
-        print("[CURATOR] candidates:")
+        print("[CURATOR] candidates:", file=file)
         for c in candidates:
-            subj = c.get("subj", "USER")
-            rel = c.get("rel", "FACT")
-            obj = c.get("obj", "")
-            conf = c.get("confidence", None)
-            if conf is None:
-                print(f"  - {subj}  {rel}  {obj}")
-            else:
-                try:
-                    print(f"  - {subj}  {rel}  {obj}   (conf={float(conf):.2f})")
-                except Exception:
-                    print(f"  - {subj}  {rel}  {obj}   (conf={conf})")
+            print(f"  - {c.subj}  {c.rel}  {c.obj}   (conf={c.confidence:.2f})", file=file)
     else:
-        print("[CURATOR] candidates: (none)")
+        print("[CURATOR] candidates: (none)", file=file)
 
     if notes:
-        print("[CURATOR] notes:", "; ".join(notes))
+        print("[CURATOR] notes:", "; ".join(notes), file=file)
     else:
-        print("[CURATOR] notes: (none)")
-    print()
+        print("[CURATOR] notes: (none)", file=file)
+    print(file=file)
 
 
-def _pretty_print_enricher(enricher_result):
+def _pretty_print_enricher(enricher_result, file=None):
     # New EnricherResult has: relations, notes only
     rels = getattr(enricher_result, "relations", None) or []
     notes = getattr(enricher_result, "notes", None) or []
 
     if rels:
-        print("[ENRICHER] relations:")
+        print("[ENRICHER] relations:", file=file)
         for r in rels:
-            subj = r.get("subj", "")
-            rel = r.get("rel", "")
-            obj = r.get("obj", "")
-            conf = r.get("confidence", None)
-            if conf is None:
-                print(f"  - {subj}  {rel}  {obj}")
-            else:
-                try:
-                    print(f"  - {subj}  {rel}  {obj}   (conf={float(conf):.2f})")
-                except Exception:
-                    print(f"  - {subj}  {rel}  {obj}   (conf={conf})")
+            print(f"  - {r.subj}  {r.rel}  {r.obj}   (conf={r.confidence:.2f})", file=file)
     else:
-        print("[ENRICHER] relations: (none)")
+        print("[ENRICHER] relations: (none)", file=file)
 
     if notes:
-        print("[ENRICHER] notes:", "; ".join(str(n) for n in notes if str(n).strip()))
+        print("[ENRICHER] notes:", "; ".join(str(n) for n in notes if str(n).strip()), file=file)
     else:
-        print("[ENRICHER] notes: (none)")
-    print()
+        print("[ENRICHER] notes: (none)", file=file)
+    print(file=file)
+
+
+def _flush(buf: io.StringIO) -> None:
+    """Write everything buffered for this turn with a single stdout write."""
+    text = buf.getvalue()
+    if text:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    buf.seek(0)
+    buf.truncate()
+
+
+@dataclass(slots=True)
+class State:
+    show_curator: bool = True
+    show_enricher: bool = True
+
+
+def _toggle(attr: str, label: str, on: bool) -> Callable[[State], None]:
+    def handler(state: State) -> None:
+        setattr(state, attr, on)
+        print(f"[INFO] {label} output: {'ON' if on else 'OFF'}\n")
+    return handler
+
+
+_curator_on = _toggle("show_curator", "Curator", True)
+_curator_off = _toggle("show_curator", "Curator", False)
+_enricher_on = _toggle("show_enricher", "Enricher", True)
+_enricher_off = _toggle("show_enricher", "Enricher", False)
+
+# Exact (lowercased) REPL commands -> handler; /kg is parameterized and
+# dispatched separately.
+_CMDS: Dict[str, Callable[[State], None]] = {
+    "/curator on": _curator_on,
+    "curator on": _curator_on,
+    "/curator off": _curator_off,
+    "curator off": _curator_off,
+    "/enricher on": _enricher_on,
+    "enricher on": _enricher_on,
+    "/enricher off": _enricher_off,
+    "enricher off": _enricher_off,
+}
+
+
+# Cached Curator/Enricher results are written to disk every few turns (and
+# at exit) rather than once per result.
+CACHE_FLUSH_EVERY = 5
+
+
+CHAT_SYSTEM_PROMPT = (
+    "You are an AI assistant that is getting to know the user over time.\n"
+    "You chat naturally, ask follow-up questions, and remember what the user "
+    "tells you, but memory storage is handled externally.\n"
+    "Focus on a natural, helpful conversation.\n"
+    "Do not mention Neo4j or knowledge graphs unless the user explicitly asks."
+)
+
+
+# Models and agents are built on first use, not before the prompt: a session
+# that only runs /kg commands never builds the Curator/Enricher ones, and the
+# separate Curator/Enricher agents are only the fallback for the fused one.
+@cache
+def _chat_model():
+    return create_chat_model()
+
+
+@cache
+def _chat_agent() -> ChatAgent:
+    system_msg = BaseMessage.make_assistant_message(
+        role_name="PersonalKGAIAgent",
+        content=CHAT_SYSTEM_PROMPT,
+    )
+    return ChatAgent(system_message=system_msg, model=_chat_model())
+
+
+@cache
+def _curator_agent() -> ChatAgent:
+    return make_curator_agent(create_curator_model())
+
+
+@cache
+def _enricher_agent() -> ChatAgent:
+    return make_enricher_agent(create_enricher_model())
+
+
+@cache
+def _fused_agent() -> Optional[ChatAgent]:
+    # One call per turn for Curator + Enricher; SENTINEL_FUSED=0 always uses
+    # the two-call path.
+    if os.environ.get("SENTINEL_FUSED", "1") == "0":
+        return None
+    return make_curator_enricher_agent(create_curator_enricher_model())
+
+
+def _curate(user_input: str, fused: Dict[str, EnricherResult]) -> CuratorResult:
+    """Curator result for the turn; a fused call also leaves the Enricher's in fused."""
+    fused_agent = _fused_agent()
+    if fused_agent is not None:
+        both = run_curator_enricher(fused_agent, user_input)
+        if both is not None:
+            fused["enricher"] = both[1]
+            return both[0]
+    return run_curator(_curator_agent(), user_input)
+
+
+def _enrich(curator_result: CuratorResult) -> EnricherResult:
+    return run_enricher(
+        _enricher_agent(),
+        clean_text=curator_result.clean_text,
+        candidates=curator_result.candidates,
+    )
+
+
+def _print_session_end() -> None:
+    print("\n[!] SESSION ENDED [!]")
+    print("Your knowledge graph remains in Neo4j until you erase it.")
 
 
 def main():
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        print("\n[INFO] Exiting chat.")
+        _print_session_end()
+
+
+async def main_async():
     neo = connect_neo4j(clear=False)
+    warm_known_facts(neo)
 
     user_canonical_id = load_user_canonical_id()
     print(f"[INFO] Canonical user id: {user_canonical_id}")
 
-    chat_model = create_chat_model()
-    curator_model = create_curator_model()
-    enricher_model = create_enricher_model()
-
-    curator_agent = make_curator_agent(curator_model)
-    enricher_agent = make_enricher_agent(enricher_model)
-
-    system_msg = BaseMessage.make_assistant_message(
-        role_name="PersonalKGAIAgent",
-        content=(
-            "You are an AI assistant that is getting to know the user over time.\n"
-            "You chat naturally, ask follow-up questions, and remember what the user "
-            "tells you, but memory storage is handled externally.\n"
-            "Focus on a natural, helpful conversation.\n"
-            "Do not mention Neo4j or knowledge graphs unless the user explicitly asks."
-        ),
-    )
-    chat_agent = ChatAgent(system_message=system_msg, model=chat_model)
+    curator_cache = get_semcache("curator")
+    enricher_cache = get_semcache("enricher")
 
     print("\n[!] PERSONAL KG CHAT [!]")
     print("Commands:")
@@ -112,12 +219,12 @@ def main():
     print('  - "exit" / "quit"          -> end the session.\n')
 
     pending_conflict = None
-    show_curator = True
-    show_enricher = True
+    state = State()
+    turns = 0
 
     while True:
         try:
-            user_input = input("You: ").strip()
+            user_input = (await in_daemon_thread(input, "You: ")).strip()
         except (EOFError, KeyboardInterrupt):
             print("\n[INFO] Exiting chat.")
             break
@@ -125,27 +232,17 @@ def main():
         if not user_input:
             continue
 
-        lower = user_input.lower()
-
-        if lower in ("/curator on", "curator on"):
-            show_curator = True
-            print("[INFO] Curator output: ON\n")
-            continue
-        if lower in ("/curator off", "curator off"):
-            show_curator = False
-            print("[INFO] Curator output: OFF\n")
-            continue
+        # Commands are short, so only a prefix is lowercased; a long pasted
+        # message is never copied just to be dispatched. An exact match on a
+        # 20-char prefix can only hit when the whole input is that command.
+        prefix_low = user_input[:20].lower()
 
-        if lower in ("/enricher on", "enricher on"):
-            show_enricher = True
-            print("[INFO] Enricher output: ON\n")
-            continue
-        if lower in ("/enricher off", "enricher off"):
-            show_enricher = False
-            print("[INFO] Enricher output: OFF\n")
+        handler = _CMDS.get(prefix_low)
+        if handler is not None:
+            handler(state)
             continue
 
-        if pending_conflict is not None and not lower.startswith("/kg"):
+        if pending_conflict is not None and not prefix_low.startswith("/kg"):
             choice = interpret_conflict_choice(user_input)
             if choice is not None:
                 apply_conflict_resolution(neo, choice, pending_conflict)
@@ -153,80 +250,94 @@ def main():
                 print("Assistant (KG): Memory updated based on your decision.\n")
                 continue
 
-        if lower.startswith("/kg"):
-            handled, neo = handle_kg_command(neo, chat_model, user_input)
+        if prefix_low.startswith("/kg"):
+            handled, neo = await handle_kg_command_async(neo, _chat_model(), user_input)
             if handled:
                 continue
 
-        if lower in ("exit", "quit", "/exit", "/quit"):
+        if prefix_low in ("exit", "quit", "/exit", "/quit"):
             print("[INFO] Goodbye.")
             break
 
-        resp = chat_agent.step(user_input)
+        turns += 1
+        if turns % CACHE_FLUSH_EVERY == 0:
+            await in_daemon_thread(flush_store)
+
+        # Filled when one fused call produced both the Curator and Enricher
+        # results for this turn
+        fused: Dict[str, EnricherResult] = {}
+
+        # The Curator only needs user_input, so it runs while the chat reply
+        # is generated; the reply is still printed as soon as it is ready.
+        curate = partial(_curate, user_input, fused)
+        curator_task = asyncio.create_task(
+            in_daemon_thread(cached_call, curator_cache, user_input, curate)
+        )
+        resp = await in_daemon_thread(_chat_agent().step, user_input)
         assistant_msg = resp.msg.content
         print(f"\nAssistant: {assistant_msg}\n")
 
-        # 1) Curator
-        curator_result = run_curator(curator_agent, user_input)
-        if show_curator:
-            _pretty_print_curator(curator_result)
+        # Turn diagnostics are collected and written in one go; flushed before
+        # the Enricher call so they do not sit in the buffer while it runs.
+        out = io.StringIO()
+
+        # 1) Curator (repeated or paraphrased messages skip the LLM)
+        curator_result = await curator_task
+        if state.show_curator:
+            _pretty_print_curator(curator_result, file=out)
+        _flush(out)
 
         # If nothing to remember, stop
         if not curator_result.candidates:
             continue
 
-        # 2) Enricher
-        enricher_result = run_enricher(
-            enricher_agent,
-            clean_text=curator_result.clean_text,
-            candidates=curator_result.candidates,
-        )
-        if show_enricher:
-            _pretty_print_enricher(enricher_result)
+        # 2) Enricher; a fused call already produced it, so the cache is only
+        # written, never consulted
+        if "enricher" in fused:
+            enricher_result = fused["enricher"]
+            remember(enricher_cache, user_input, enricher_result)
+        else:
+            enrich = partial(_enrich, curator_result)
+            enricher_result = await in_daemon_thread(cached_call, enricher_cache, user_input, enrich)
+        if state.show_enricher:
+            _pretty_print_enricher(enricher_result, file=out)
 
         # 3) Convert enriched relations to Triplets and store
         timestamp = make_timestamp()
 
-        # IMPORTANT: call build_triplets_from_enricher with the signature your current enricher.py supports
-        triplets = build_triplets_from_enricher(
-            enricher_result,
-            user_canonical_id=user_canonical_id,
-        )
+        # Falls back to the Curator candidates if the Enricher produced nothing
+        triplets = triplets_for_turn(curator_result, enricher_result, user_canonical_id)
 
-        # Fallback: if Enricher produced nothing, store Curator candidates flat
-        if not triplets:
-            for c in curator_result.candidates:
-                subj_raw = str(c.get("subj", "USER")).strip()
-                rel_raw = str(c.get("rel", "FACT")).strip()
-                obj_raw = str(c.get("obj", "")).strip()
-                if not obj_raw:
-                    continue
-
-                subj = user_canonical_id if subj_raw.upper() == "USER" else subj_raw
-                t = Triplet(subj=norm(subj), rel=normalize_relation(rel_raw), obj=norm(obj_raw))
-                triplets.append(t)
-
-        for t in triplets:
-            if triplet_exists(neo, t.subj, t.rel, t.obj):
-                continue
+        # One batched write for the whole turn; only new triplets go on to
+        # conflict checks
+        created = upsert_triplets_batch(neo, triplets, timestamp)
+        # Triplets written after this one in the same turn; the sequential
+        # loop this replaces had not stored them yet when checking conflicts
+        later = set(created)
+
+        for subj, rel, obj in created:
+            later.discard((subj, rel, obj))
+            t = Triplet(subj=subj, rel=rel, obj=obj)
 
-            print(f"[KG] STORE [{timestamp}] {t.subj} -[{t.rel}]-> {t.obj}")
+            print(f"[KG] STORE [{timestamp}] {t.subj} -[{t.rel}]-> {t.obj}", file=out)
 
-            conflicts = detect_conflicts(neo, t.subj, t.rel, t.obj)
-            neo.add_triplet(subj=t.subj, obj=t.obj, rel=t.rel, timestamp=timestamp)
+            conflicts = [
+                c for c in detect_conflicts(neo, t.subj, t.rel, t.obj)
+                if (c.get("subj"), c.get("rel"), c.get("obj")) not in later
+            ]
 
             if conflicts:
                 explanation = xai_explain_conflict(
-                    chat_model,
+                    _chat_model(),
                     conflicts,
                     new_subj=t.subj,
                     new_rel=t.rel,
                     new_obj=t.obj,
                     new_ts=timestamp,
                 )
-                print("Assistant (memory/XAI):")
-                print(explanation)
-                print()
+                print("Assistant (memory/XAI):", file=out)
+                print(explanation, file=out)
+                print(file=out)
 
                 pending_conflict = {
                     "subj": t.subj,
@@ -236,8 +347,10 @@ def main():
                     "old": conflicts,
                 }
 
-    print("\n[!] SESSION ENDED [!]")
-    print("Your knowledge graph remains in Neo4j until you erase it.")
+        _flush(out)
+
+    flush_store()
+    _print_session_end()
 
 
 if __name__ == "__main__":
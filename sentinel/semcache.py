@@ -0,0 +1,126 @@
+"""
+Per-utterance result cache for the Curator and Enricher. Only a repeated
+message (after whitespace/case normalization) reuses a stored result: a
+paraphrase can negate or change a fact ("I no longer live in Sydney"), so
+near matches are never replayed. Results persist across restarts through
+cache_store.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from . import _jsonutil
+from .cache_store import CacheStore, get_store
+from .curator import _result_from_data as _curator_result_from_data
+from .enricher import _result_from_data as _enricher_result_from_data
+
+# Cache name -> rebuilds a result from its as_dict() JSON.
+_DECODERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "curator": _curator_result_from_data,
+    "enricher": _enricher_result_from_data,
+}
+
+
+def normalize_utterance(text: str) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+def _result_objects(result: Any) -> Iterable[str]:
+    for field in ("candidates", "relations"):
+        for r in getattr(result, field, None) or []:
+            obj = getattr(r, "obj", None)
+            if obj:
+                yield str(obj)
+
+
+def _hash(key: str) -> str:
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, name: str, store: Optional[CacheStore] = None):
+        self.name = name  # cache_store column
+        self._decode = _DECODERS[name]
+        self.store = store if store is not None else get_store()
+        self._lock = threading.Lock()
+        self._exact: Dict[str, Any] = {}  # utterance hash -> result
+        self._load()
+
+    def _load(self) -> None:
+        for key, blob in self.store.rows(self.name):
+            try:
+                self._exact[key] = self._decode(_jsonutil.loads(blob))
+            except Exception:
+                continue  # not valid JSON for this cache
+
+    def get(self, text: str) -> Optional[Any]:
+        key = _hash(normalize_utterance(text))
+        with self._lock:
+            return self._exact.get(key)
+
+    def put(self, text: str, result: Any) -> None:
+        key = _hash(normalize_utterance(text))
+        self.store.put(key, self.name, _jsonutil.dumps(result.as_dict()).encode())
+        with self._lock:
+            self._exact[key] = result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+
+
+_caches: Dict[str, ResultCache] = {}
+
+
+def get_cache(name: str) -> Optional[ResultCache]:
+    """Named process-wide cache; None when disabled with SENTINEL_SEMCACHE=0."""
+    if os.environ.get("SENTINEL_SEMCACHE", "1") == "0":
+        return None
+    cache = _caches.get(name)
+    if cache is None:
+        try:
+            cache = ResultCache(name)
+        except Exception as e:
+            print(f"[WARN] Result cache unavailable: {e}")
+            return None
+        _caches[name] = cache
+    return cache
+
+
+def clear_caches() -> None:
+    """Forget every cached result, in memory and on disk (e.g. after /kg clean)."""
+    for cache in _caches.values():
+        cache.clear()
+    get_store().clear()
+
+
+def cached_call(cache: Optional[ResultCache], text: str, fn: Callable[[], Any]) -> Any:
+    """
+    fn() for this utterance, reusing the stored result for a repeated one. Results
+    without any facts are not stored, so a one-off bad reply does not stick.
+    """
+    if cache is None:
+        return fn()
+    try:
+        hit = cache.get(text)
+    except Exception as e:
+        print(f"[WARN] Result cache lookup failed: {e}")
+        hit = None
+    if hit is not None:
+        return hit
+
+    result = fn()
+    remember(cache, text, result)
+    return result
+
+
+def remember(cache: Optional[ResultCache], text: str, result: Any) -> None:
+    """Store a result produced elsewhere; like cached_call, only if it has facts."""
+    if cache is None or not any(True for _ in _result_objects(result)):
+        return
+    try:
+        cache.put(text, result)
+    except Exception as e:
+        print(f"[WARN] Result cache store failed: {e}")
\ No newline at end of file
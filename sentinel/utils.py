@@ -1,23 +1,93 @@
+import asyncio
 import re
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-
+import sys
+import threading
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+
+async def in_daemon_thread(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    await fn(*args) run on a daemon thread. Unlike asyncio.to_thread, Ctrl-C
+    does not wait for a blocking LLM call or input() to return before exiting.
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def _settle(setter, value):
+        if not fut.done():
+            setter(value)
+
+    def _run():
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            settle = (_settle, fut.set_exception, e)
+        else:
+            settle = (_settle, fut.set_result, result)
+        try:
+            loop.call_soon_threadsafe(*settle)
+        except RuntimeError:
+            pass  # the loop already closed, nobody is waiting
+
+    threading.Thread(target=_run, daemon=True).start()
+    return await fut
+
+
+def clean_str(value: Any, default: str = "") -> str:
+    """Stripped string form of an LLM JSON field, or default if blank."""
+    s = value if isinstance(value, str) else str(value)
+    return s.strip() or default
+
+
+def to_confidence(value: Any, default: float = 0.8) -> float:
+    """Coerce a confidence value into [0, 1]; numbers skip the float() parse."""
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except Exception:
+            value = default
+    return max(0.0, min(float(value), 1.0))
+
+
+# \w is exactly str.isalnum() plus "_", so this maps every other character
+# to "_" in one C-level pass.
+_NON_WORD_RE = re.compile(r"\W")
+# The same mapping for ASCII input as a bytes.translate table.
+_ASCII_WORD_TABLE = bytes(
+    b if b == 0x5F or (b < 0x80 and chr(b).isalnum()) else 0x5F for b in range(256)
+)
+
+
+# Entity names repeat heavily across turns ("USER", cities, programs).
+@lru_cache(maxsize=4096)
 def norm(text: str) -> str:
     if not text:
         text = "node"
-    out = "".join(c if c.isalnum() else "_" for c in text)
+    if text.isascii():
+        # The usual case (LLM ids, English names): one table lookup per byte.
+        out = text.encode("ascii").translate(_ASCII_WORD_TABLE).decode("ascii")
+    else:
+        out = _NON_WORD_RE.sub("_", text)
     if not out:
         out = "node"
     if out[0].isdigit():
         out = "id_" + out
-    return out[:60]
+    # Interned so ids still share one object after falling out of the cache.
+    return sys.intern(out[:60])
 
 
-def parse_iso_ts(ts: str) -> Optional[datetime]:
-    try:
-        return datetime.fromisoformat(ts)
-    except Exception:
-        return None
+_HOUR_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)")
+# Every time keyword in one scan of the question; the lookahead also reports
+# overlapping hits (e.g. "nightoday"), matching the separate `in` checks.
+_KEYWORD_RE = re.compile(r"(?=(yesterday|today|morning|afternoon|evening|night))")
+_MIDNIGHT = time(0, 0)
+# Offsets from midnight for the day-part windows
+_H5 = timedelta(hours=5)
+_H12 = timedelta(hours=12)
+_H18 = timedelta(hours=18)
+_DAY_END = timedelta(days=1) - timedelta(microseconds=1)
 
 
 def detect_time_window(
@@ -31,12 +101,14 @@ def detect_time_window(
     q = question.lower().replace(".", ":")
 
     base_date = None
-    if "yesterday" in q:
+    found = set(_KEYWORD_RE.findall(q))
+
+    if "yesterday" in found:
         base_date = (now - timedelta(days=1)).date()
-    elif "today" in q:
+    elif "today" in found:
         base_date = now.date()
 
-    hour_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)", q)
+    hour_match = _HOUR_RE.search(q)
     explicit_hour = None
     explicit_minute = 0
     if hour_match:
@@ -54,10 +126,10 @@ def detect_time_window(
 
         explicit_hour = min(max(h, 0), 23)
 
-    morning = "morning" in q
-    afternoon = "afternoon" in q
-    evening = "evening" in q
-    night = "night" in q
+    morning = "morning" in found
+    afternoon = "afternoon" in found
+    evening = "evening" in found
+    night = "night" in found
 
     if base_date is None and (morning or afternoon or evening or night):
         base_date = now.date()
@@ -68,16 +140,14 @@ def detect_time_window(
     if base_date is None and explicit_hour is None:
         return None
 
+    day_start = datetime.combine(base_date, _MIDNIGHT)
+    day_end = day_start + _DAY_END
+
     if explicit_hour is not None:
-        center = datetime.combine(base_date, datetime.min.time()).replace(
-            hour=explicit_hour, minute=explicit_minute, second=0, microsecond=0
-        )
+        center = day_start + timedelta(hours=explicit_hour, minutes=explicit_minute)
         start = center - timedelta(hours=1)
         end = center + timedelta(hours=1)
 
-        day_start = datetime.combine(base_date, datetime.min.time())
-        day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
-
         if start < day_start:
             start = day_start
         if end > day_end:
@@ -86,23 +156,12 @@ def detect_time_window(
         return start, end
 
     if morning:
-        start = datetime.combine(base_date, datetime.min.time()).replace(hour=5, minute=0, second=0, microsecond=0)
-        end = datetime.combine(base_date, datetime.min.time()).replace(hour=12, minute=0, second=0, microsecond=0)
-        return start, end
+        return day_start + _H5, day_start + _H12
 
     if afternoon:
-        start = datetime.combine(base_date, datetime.min.time()).replace(hour=12, minute=0, second=0, microsecond=0)
-        end = datetime.combine(base_date, datetime.min.time()).replace(hour=18, minute=0, second=0, microsecond=0)
-        return start, end
+        return day_start + _H12, day_start + _H18
 
     if evening or night:
-        start = datetime.combine(base_date, datetime.min.time()).replace(hour=18, minute=0, second=0, microsecond=0)
-        end = datetime.combine(base_date, datetime.min.time()).replace(hour=23, minute=59, second=59, microsecond=999999)
-        return start, end
-
-    if base_date is not None:
-        start = datetime.combine(base_date, datetime.min.time())
-        end = start + timedelta(days=1) - timedelta(microseconds=1)
-        return start, end
+        return day_start + _H18, day_end
 
-    return None
\ No newline at end of file
+    return day_start, day_end
\ No newline at end of file
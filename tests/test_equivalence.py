@@ -0,0 +1,399 @@
+"""
+The optimized helpers must behave exactly like the implementations they
+replaced. The _old_* functions below are verbatim copies of those originals
+(only renamed), checked against the current code on fixed and seeded random
+inputs.
+"""
+
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from sentinel.conflicts import interpret_conflict_choice
+from sentinel.enricher import _result_from_data, _split_field_list, build_triplets_from_enricher
+from sentinel.extract import normalize_relation
+from sentinel.utils import detect_time_window, norm
+
+# ---------------------------
+# Original implementations
+# ---------------------------
+
+
+def _old_norm(text: str) -> str:
+    if not text:
+        text = "node"
+    out = "".join(c if c.isalnum() else "_" for c in text)
+    if not out:
+        out = "node"
+    if out[0].isdigit():
+        out = "id_" + out
+    return out[:60]
+
+
+def _old_normalize_relation(rel_type: str) -> str:
+    r = (rel_type or "").strip()
+    if not r:
+        return "RELATED_TO"
+    r = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", r)
+    r = "".join(ch if ch.isalnum() else "_" for ch in r).upper()
+    while "__" in r:
+        r = r.replace("__", "_")
+    r = r.strip("_")
+    return r or "RELATED_TO"
+
+
+def _old_detect_time_window(
+    question: str,
+    now: Optional[datetime] = None
+) -> Optional[Tuple[datetime, datetime]]:
+    if now is None:
+        now = datetime.now()
+
+    q = question.lower().replace(".", ":")
+
+    base_date = None
+    if "yesterday" in q:
+        base_date = (now - timedelta(days=1)).date()
+    elif "today" in q:
+        base_date = now.date()
+
+    hour_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)", q)
+    explicit_hour = None
+    explicit_minute = 0
+    if hour_match:
+        h = int(hour_match.group(1))
+        m = hour_match.group(2)
+        ampm = hour_match.group(3)
+
+        if m is not None:
+            explicit_minute = min(max(int(m), 0), 59)
+
+        if ampm == "pm" and h != 12:
+            h += 12
+        if ampm == "am" and h == 12:
+            h = 0
+
+        explicit_hour = min(max(h, 0), 23)
+
+    morning = "morning" in q
+    afternoon = "afternoon" in q
+    evening = "evening" in q
+    night = "night" in q
+
+    if base_date is None and (morning or afternoon or evening or night):
+        base_date = now.date()
+
+    if base_date is None and explicit_hour is not None:
+        base_date = now.date()
+
+    if base_date is None and explicit_hour is None:
+        return None
+
+    if explicit_hour is not None:
+        center = datetime.combine(base_date, datetime.min.time()).replace(
+            hour=explicit_hour, minute=explicit_minute, second=0, microsecond=0
+        )
+        start = center - timedelta(hours=1)
+        end = center + timedelta(hours=1)
+
+        day_start = datetime.combine(base_date, datetime.min.time())
+        day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
+
+        if start < day_start:
+            start = day_start
+        if end > day_end:
+            end = day_end
+
+        return start, end
+
+    if morning:
+        start = datetime.combine(base_date, datetime.min.time()).replace(hour=5, minute=0, second=0, microsecond=0)
+        end = datetime.combine(base_date, datetime.min.time()).replace(hour=12, minute=0, second=0, microsecond=0)
+        return start, end
+
+    if afternoon:
+        start = datetime.combine(base_date, datetime.min.time()).replace(hour=12, minute=0, second=0, microsecond=0)
+        end = datetime.combine(base_date, datetime.min.time()).replace(hour=18, minute=0, second=0, microsecond=0)
+        return start, end
+
+    if evening or night:
+        start = datetime.combine(base_date, datetime.min.time()).replace(hour=18, minute=0, second=0, microsecond=0)
+        end = datetime.combine(base_date, datetime.min.time()).replace(hour=23, minute=59, second=59, microsecond=999999)
+        return start, end
+
+    if base_date is not None:
+        start = datetime.combine(base_date, datetime.min.time())
+        end = start + timedelta(days=1) - timedelta(microseconds=1)
+        return start, end
+
+    return None
+
+
+def _old_interpret_conflict_choice(user_text: str) -> Optional[str]:
+    t = user_text.strip().lower()
+
+    if t in ("a", "option a") or "outdated" in t or "new fact is correct" in t:
+        return "A"
+    if t in ("b", "option b") or "both" in t or "both true" in t:
+        return "B"
+    if t in ("c", "option c") or "keep the old" in t or "wrong" in t or "incorrect" in t:
+        return "C"
+
+    if t.startswith("a "):
+        return "A"
+    if t.startswith("b "):
+        return "B"
+    if t.startswith("c "):
+        return "C"
+
+    return None
+
+
+_OLD_PLACE_RELS = {"LIVES_IN", "FROM", "HOMETOWN", "LOCATED_IN"}
+_OLD_PROGRAM_HINT_RELS = {"DEGREE", "PROGRAM"}
+_OLD_FIELD_RELS = {"RESEARCH_AREA", "HAS_FIELD"}
+
+
+def _old_split_city_country(text: str) -> Optional[Tuple[str, str]]:
+    if not text or "," not in text:
+        return None
+    left, right = [p.strip() for p in text.split(",", 1)]
+    if not left or not right:
+        return None
+    return left, right
+
+
+def _old_split_field_list(text: str) -> List[str]:
+    t = (text or "").strip()
+    if not t:
+        return []
+    t = t.replace(" & ", " and ")
+    t = t.replace(", and ", ", ")
+    parts = []
+    for chunk in t.split(","):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        if " and " in chunk:
+            subparts = [p.strip() for p in chunk.split(" and ") if p.strip()]
+            parts.extend(subparts)
+        else:
+            parts.append(chunk)
+    seen = set()
+    out = []
+    for p in parts:
+        key = p.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(p)
+    return out
+
+
+def _old_build_triplets(
+    relations: List[Dict[str, Any]],
+    user_canonical_id: str,
+) -> List[Tuple[str, str, str]]:
+    user_node = _old_norm(user_canonical_id)
+
+    degree_program: Optional[str] = None
+    collected_fields: List[str] = []
+    raw_pairs: List[Tuple[str, str, str]] = []
+
+    for r in relations:
+        subj_raw = str(r.get("subj", "USER")).strip()
+        rel_raw = str(r.get("rel", "")).strip()
+        obj_raw = str(r.get("obj", "")).strip()
+
+        if not rel_raw or not obj_raw:
+            continue
+
+        subj = user_node if subj_raw.upper() == "USER" else _old_norm(subj_raw)
+        rel = _old_normalize_relation(rel_raw)
+
+        if rel in _OLD_PROGRAM_HINT_RELS and subj == user_node:
+            degree_program = obj_raw.strip()
+            continue
+
+        if rel in _OLD_FIELD_RELS and subj == user_node:
+            low = obj_raw.lower()
+            if low.startswith("phd in "):
+                degree_program = "PhD"
+                fields_part = obj_raw[7:].strip()
+                collected_fields.extend(_old_split_field_list(fields_part))
+                continue
+
+        if rel in _OLD_FIELD_RELS and subj == user_node:
+            collected_fields.append(obj_raw)
+            continue
+
+        raw_pairs.append((subj, rel, obj_raw))
+
+    out: List[Tuple[str, str, str]] = []
+
+    for subj, rel, obj_raw in raw_pairs:
+        if rel in _OLD_PLACE_RELS:
+            split = _old_split_city_country(obj_raw)
+            if split:
+                city, country = split
+                city_id = _old_norm(city)
+                country_id = _old_norm(country)
+                out.append((subj, rel, city_id))
+                out.append((city_id, "LOCATED_IN", country_id))
+                continue
+        out.append((subj, rel, _old_norm(obj_raw)))
+
+    if degree_program:
+        program_node = _old_norm(degree_program)
+        out.append((user_node, "HAS_PROGRAM", program_node))
+        for f in _old_split_field_list(", ".join(collected_fields)) if len(collected_fields) > 1 else collected_fields:
+            f = (f or "").strip()
+            if not f:
+                continue
+            out.append((program_node, "HAS_FIELD", _old_norm(f)))
+    else:
+        for f in collected_fields:
+            f = (f or "").strip()
+            if not f:
+                continue
+            out.append((user_node, "RESEARCH_AREA", _old_norm(f)))
+
+    seen = set()
+    deduped: List[Tuple[str, str, str]] = []
+    for t in out:
+        if t[1] == "NAME" and t[0] == t[2]:
+            continue
+        if t in seen:
+            continue
+        seen.add(t)
+        deduped.append(t)
+    return deduped
+
+
+# ---------------------------
+# Comparisons
+# ---------------------------
+
+
+def _random_strings(alphabet: str, count: int, max_len: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len))) for _ in range(count)]
+
+
+def test_norm_matches_original():
+    cases = ["", "___", "1abc", "x" * 100, "١٢", "x́y", "😀"]
+    cases += [chr(i) for i in range(0x3000)]
+    cases += _random_strings("aZ_ -9é.ßÉ,Σ1١́‍😀\t", 5000, 70, seed=4)
+    for c in cases:
+        assert norm(c) == _old_norm(c), repr(c)
+
+
+def test_normalize_relation_matches_original():
+    cases = ["", "____", "StudiesIn", "lives in", "HAS__FIELD", "_x_", "ABCdef", "a.b.c", "ß", "ﬁle", "x́y", "١٢"]
+    cases += _random_strings("aZ_ -9é.ßÉ__,ΣxY1", 5000, 12, seed=1)
+    for c in cases:
+        assert normalize_relation(c) == _old_normalize_relation(c), repr(c)
+
+
+def test_detect_time_window_matches_original():
+    words = [
+        "nightoday", "yesterdaytoday", "today", "yesterday", "morning", "afternoon",
+        "evening", "night", "at", "3pm", "12am", "12:30 pm", "7.15am", "what", "did",
+        "i", "say", "tonight", "13pm", "0am",
+    ]
+    rng = random.Random(3)
+    now = datetime(2026, 10, 14, 10, 0)
+    cases = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 4))) for _ in range(5000)]
+    for c in cases:
+        assert detect_time_window(c, now) == _old_detect_time_window(c, now), repr(c)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "a", "A", " b ", "C", "option a", "Option B", "option c", "a please", "b sure",
+        "c no", "both are wrong", "wrong, both", "it's outdated", "new fact is correct",
+        "keep the old one", "incorrect", "exit", "", "d", "ab", "A.", "a\tb", "Both",
+        "the new fact is incorrect", "x",
+    ],
+)
+def test_interpret_conflict_choice_matches_original(text):
+    assert interpret_conflict_choice(text) == _old_interpret_conflict_choice(text)
+
+
+_FIELD_TOKENS = ["a", "b", "AI", " ", ",", " and ", "and", " & ", "&", "  ", ", and ", "x"]
+
+
+def test_split_field_list_matches_original():
+    cases = [
+        "LLMs, multi-agent systems, and knowledge graph", "AI and ML", "R&D, AI & ML",
+        "a,,b", "a , b and c, and d", "AI, ai", "  ", "x and  y", "Q&A",
+    ]
+    rng = random.Random(1)
+    cases += ["".join(rng.choice(_FIELD_TOKENS) for _ in range(rng.randint(0, 8))) for _ in range(5000)]
+    for c in cases:
+        assert _split_field_list(c) == _old_split_field_list(c), repr(c)
+
+
+_TRIPLET_CASES = [
+    [
+        {"subj": "USER", "rel": "LIVES_IN", "obj": "Melbourne, Australia"},
+        {"subj": "USER", "rel": "NAME", "obj": "Paul"},
+        {"subj": "USER", "rel": "DEGREE", "obj": "PhD"},
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "AI"},
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "multi-agent systems, and KGs"},
+    ],
+    [
+        {"subj": "USER", "rel": "HAS_FIELD", "obj": "PhD in LLMs, agents and graphs"},
+        {"subj": "USER", "rel": "FROM", "obj": "Vietnam"},
+        {"subj": "Paul", "rel": "NAME", "obj": "Paul"},
+    ],
+    [
+        {"subj": "USER", "rel": "researchArea", "obj": "AI, ML"},
+        {"subj": "USER", "rel": "lives in", "obj": "Hanoi"},
+        {"subj": "USER", "rel": "LIVES_IN", "obj": "Hanoi"},
+    ],
+    [
+        {"subj": "Melbourne", "rel": "LOCATED_IN", "obj": "Victoria, Australia"},
+        {"subj": "USER", "rel": "", "obj": "x"},
+        {"subj": "USER", "rel": "AGE", "obj": "24"},
+    ],
+    [
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "AI"},
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "ai"},
+        {"subj": "USER", "rel": "PROGRAM", "obj": "Master"},
+    ],
+    [
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "AI and ML"},
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "ML"},
+        {"subj": "USER", "rel": "DEGREE", "obj": "PhD"},
+    ],
+    [
+        {"subj": "USER", "rel": "HAS_FIELD", "obj": "PhD in AI, ML"},
+        {"subj": "USER", "rel": "RESEARCH_AREA", "obj": "ml"},
+    ],
+]
+
+
+def _random_triplet_cases(count: int, seed: int) -> List[List[Dict[str, str]]]:
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        items = []
+        for _ in range(rng.randint(1, 4)):
+            rel = rng.choice(["RESEARCH_AREA", "HAS_FIELD", "DEGREE", "LIVES_IN"])
+            obj = "".join(rng.choice(_FIELD_TOKENS) for _ in range(rng.randint(1, 6))).strip() or "q"
+            if rng.random() < 0.2:
+                obj = "PhD in " + obj
+            items.append({"subj": "USER", "rel": rel, "obj": obj})
+        cases.append(items)
+    return cases
+
+
+def test_build_triplets_matches_original():
+    for items in _TRIPLET_CASES + _random_triplet_cases(3000, seed=1):
+        new = build_triplets_from_enricher(_result_from_data({"relations": items}), "Paul")
+        assert [(t.subj, t.rel, t.obj) for t in new] == _old_build_triplets(items, "Paul"), items
\ No newline at end of file
@@ -0,0 +1,54 @@
+from sentinel._jsonutil import iter_json_objects, parse_json_object
+
+
+def test_plain_object():
+    assert parse_json_object('{"a": 1}') == {"a": 1}
+    assert parse_json_object('  {"a": 1}\n') == {"a": 1}
+
+
+def test_empty_or_no_object():
+    assert parse_json_object("") is None
+    assert parse_json_object(None) is None
+    assert parse_json_object("no json here") is None
+    assert parse_json_object("} backwards {") is None
+
+
+def test_non_object_json_is_rejected():
+    assert parse_json_object("[1, 2]") is None
+    assert parse_json_object("[{}]") == {}  # falls back to the first embedded object
+
+
+def test_markdown_fences_and_prose():
+    text = 'Here you go:\n```json\n{"relations": [], "notes": ["ok"]}\n```\nDone.'
+    assert parse_json_object(text) == {"relations": [], "notes": ["ok"]}
+
+
+def test_first_last_brace_slice_failing_falls_back_to_scan():
+    # '{' to '}' spans both objects, which is not valid JSON on its own
+    text = 'first {"a": 1} then {"b": 2}'
+    assert parse_json_object(text) == {"a": 1}
+
+
+def test_scan_skips_invalid_spans():
+    text = 'junk {not json} and {"b": 2} trailing }'
+    assert parse_json_object(text) == {"b": 2}
+
+
+def test_braces_inside_strings():
+    text = 'x {"s": "a } b { c", "n": {"d": 1}} y {"z": 0}'
+    assert parse_json_object(text) == {"s": "a } b { c", "n": {"d": 1}}
+
+
+def test_whole_text_object_that_fails_to_parse_falls_back_to_scan():
+    text = '{"a": 1} {"b": 2}'
+    assert parse_json_object(text) == {"a": 1}
+
+
+def test_keys_are_kept():
+    data = parse_json_object('{"relations": [1], "notes": [], "extra": true}', keys=("relations", "notes"))
+    assert data["relations"] == [1]
+    assert data["notes"] == []
+
+
+def test_iter_json_objects():
+    assert list(iter_json_objects('a {"x": {"y": 1}} b {"z": "}"} {')) == ['{"x": {"y": 1}}', '{"z": "}"}']
\ No newline at end of file
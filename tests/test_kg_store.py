@@ -0,0 +1,184 @@
+import re
+
+import pytest
+
+from sentinel import kg_store
+from sentinel.extract import Triplet
+from sentinel.kg_store import TripletMirror, forget_triplet, upsert_triplets_batch
+
+_REL_RE = re.compile(r"\[r:`(\w+)`\]")
+
+
+class FakeNeo:
+    """Answers _cypher_upsert_batch queries from an in-memory set of edges."""
+
+    def __init__(self, edges=()):
+        self.edges = set(edges)
+        self.queries = 0
+
+    def query(self, cypher, params):
+        self.queries += 1
+        rel = _REL_RE.search(cypher).group(1)
+        out = []
+        for row in params["rows"]:
+            key = (row["subj"], rel, row["obj"])
+            out.append({"subj": row["subj"], "obj": row["obj"], "created": key not in self.edges})
+            self.edges.add(key)
+        return out
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    kg_store._SEEN.clear()
+    kg_store.MIRROR.load([], [])
+    yield
+    kg_store._SEEN.clear()
+    kg_store.MIRROR.load([], [])
+
+
+# ---------------------------
+# TripletMirror
+# ---------------------------
+
+def test_incomplete_relation_is_unknown_and_not_filled_on_write():
+    m = TripletMirror()
+    assert m.get("Paul", "LIVES_IN") is None
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    # Other objects may already be stored, so a write alone proves nothing
+    assert m.get("Paul", "LIVES_IN") is None
+
+
+def test_load_marks_relations_complete():
+    m = TripletMirror()
+    m.load([{"subj": "Paul", "rel": "LIVES_IN", "obj": "Sydney", "timestamp": "t1"}], {"LIVES_IN"})
+    assert m.get("Paul", "LIVES_IN") == [("Sydney", "t1")]
+    assert m.get("Anna", "LIVES_IN") == []
+    assert m.get("Paul", "WORKS_AT") is None
+
+
+def test_load_replaces_previous_contents():
+    m = TripletMirror()
+    m.clear()
+    m.set_on_write("Paul", "WORKS_AT", "Acme", "t1")
+    m.load([], {"LIVES_IN"})
+    assert m.get("Paul", "WORKS_AT") is None
+    assert m.get("Paul", "LIVES_IN") == []
+
+
+def test_clear_makes_every_relation_complete():
+    m = TripletMirror()
+    m.clear()
+    assert m.get("Paul", "LIVES_IN") == []
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t2")
+    assert m.get("Paul", "LIVES_IN") == [("Sydney", "t2")]
+
+
+def test_eviction_downgrades_completeness():
+    m = TripletMirror(maxsize=2)
+    m.load([], {"LIVES_IN", "WORKS_AT"})
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    m.set_on_write("Anna", "WORKS_AT", "Acme", "t2")
+    m.set_on_write("Anna", "LIVES_IN", "Perth", "t3")
+
+    # The evicted key reads as a miss, and so does anything else of its rel
+    assert m.get("Paul", "LIVES_IN") is None
+    assert m.get("Bob", "LIVES_IN") is None
+    assert m.get("Anna", "LIVES_IN") == [("Perth", "t3")]
+    assert m.get("Bob", "WORKS_AT") == []
+
+
+def test_eviction_after_clear_drops_complete_all():
+    m = TripletMirror(maxsize=1)
+    m.clear()
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    m.set_on_write("Anna", "WORKS_AT", "Acme", "t2")
+    assert m.get("Paul", "LIVES_IN") is None
+    assert m.get("Bob", "HAS_PET") is None
+
+
+def test_discard_keeps_the_key_known():
+    m = TripletMirror()
+    m.clear()
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    m.set_on_write("Paul", "LIVES_IN", "Perth", "t2")
+    m.discard("Paul", "LIVES_IN", "Sydney")
+    assert m.get("Paul", "LIVES_IN") == [("Perth", "t2")]
+    m.discard("Paul", "LIVES_IN", "Perth")
+    assert m.get("Paul", "LIVES_IN") == []
+    m.discard("Anna", "LIVES_IN", "Perth")  # unknown key: no-op
+    assert m.get("Anna", "LIVES_IN") == []
+
+
+def test_get_returns_a_copy():
+    m = TripletMirror()
+    m.clear()
+    m.set_on_write("Paul", "LIVES_IN", "Sydney", "t1")
+    m.get("Paul", "LIVES_IN").append(("Perth", "t2"))
+    assert m.get("Paul", "LIVES_IN") == [("Sydney", "t1")]
+
+
+# ---------------------------
+# upsert_triplets_batch
+# ---------------------------
+
+def test_upsert_returns_created_keys_in_input_order():
+    neo = FakeNeo()
+    triplets = [
+        Triplet("Paul", "LIVES_IN", "Sydney"),
+        Triplet("Paul", "WORKS_AT", "Acme"),
+        Triplet("Paul", "LIVES_IN", "Sydney"),
+        Triplet("Paul", "LIKES", "Tea"),
+    ]
+    created = upsert_triplets_batch(neo, triplets, "t1")
+    assert created == [
+        ("Paul", "LIVES_IN", "Sydney"),
+        ("Paul", "WORKS_AT", "Acme"),
+        ("Paul", "LIKES", "Tea"),
+    ]
+    assert neo.queries == 3  # one UNWIND per relation type
+
+
+def test_upsert_skips_seen_triplets_without_a_query():
+    neo = FakeNeo()
+    t = Triplet("Paul", "LIVES_IN", "Sydney")
+    assert upsert_triplets_batch(neo, [t], "t1") == [("Paul", "LIVES_IN", "Sydney")]
+    assert upsert_triplets_batch(neo, [t], "t2") == []
+    assert neo.queries == 1
+
+
+def test_upsert_does_not_report_existing_edges():
+    neo = FakeNeo({("Paul", "LIVES_IN", "Sydney")})
+    t = Triplet("Paul", "LIVES_IN", "Sydney")
+    assert upsert_triplets_batch(neo, [t], "t1") == []
+    assert ("Paul", "LIVES_IN", "Sydney") in kg_store._SEEN
+    assert upsert_triplets_batch(neo, [t], "t2") == []
+    assert neo.queries == 1
+
+
+def test_forgotten_triplet_is_sent_again():
+    neo = FakeNeo()
+    t = Triplet("Paul", "LIVES_IN", "Sydney")
+    upsert_triplets_batch(neo, [t], "t1")
+    forget_triplet("Paul", "LIVES_IN", "Sydney")
+    neo.edges.clear()
+    assert upsert_triplets_batch(neo, [t], "t2") == [("Paul", "LIVES_IN", "Sydney")]
+    assert neo.queries == 2
+
+
+def test_upsert_mirrors_created_triplets():
+    kg_store.MIRROR.load([], {"LIVES_IN"})
+    neo = FakeNeo()
+    upsert_triplets_batch(
+        neo, [Triplet("Anna", "LIVES_IN", "Sydney"), Triplet("Anna", "LIKES", "Tea")], "t1"
+    )
+    assert kg_store.MIRROR.get("Anna", "LIVES_IN") == [("Sydney", "t1")]
+    assert kg_store.MIRROR.get("Anna", "LIKES") is None
+
+
+def test_seen_is_lru_bounded(monkeypatch):
+    monkeypatch.setattr(kg_store, "MIRROR_SIZE", 2)
+    neo = FakeNeo()
+    for obj in ("A", "B", "C"):
+        upsert_triplets_batch(neo, [Triplet("Paul", "LIKES", obj)], "t1")
+    assert list(kg_store._SEEN) == [("Paul", "LIKES", "B"), ("Paul", "LIKES", "C")]
\ No newline at end of file
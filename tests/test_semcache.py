@@ -0,0 +1,112 @@
+import pytest
+
+from sentinel.cache_store import CacheStore
+from sentinel.curator import CuratorCandidate, CuratorResult
+from sentinel.enricher import EnricherRelation, EnricherResult
+from sentinel.semcache import ResultCache, cached_call, remember
+
+
+def _curated(obj):
+    return CuratorResult(
+        clean_text=f"I live in {obj}",
+        candidates=[CuratorCandidate(subj="USER", rel="LIVES_IN", obj=obj, confidence=0.9)],
+        notes=[],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CacheStore(tmp_path / "cache.sqlite")
+
+
+def test_exact_repeat_hits_after_normalization(store):
+    cache = ResultCache("curator", store)
+    result = _curated("Sydney")
+    cache.put("I live in Sydney", result)
+    assert cache.get("I live in Sydney") is result
+    assert cache.get("  i LIVE in   sydney ") is result
+
+
+@pytest.mark.parametrize(
+    "paraphrase",
+    [
+        "I live in Sydney now",
+        "I no longer live in Sydney",
+        "I don't live in Sydney",
+        "My sister lives in Sydney",
+        "I used to live in Sydney",
+    ],
+)
+def test_paraphrase_never_hits(store, paraphrase):
+    cache = ResultCache("curator", store)
+    cache.put("I live in Sydney", _curated("Sydney"))
+    assert cache.get(paraphrase) is None
+
+
+def test_cached_call_reuses_and_skips_the_call(store):
+    cache = ResultCache("curator", store)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return _curated("Sydney")
+
+    first = cached_call(cache, "I live in Sydney", fn)
+    second = cached_call(cache, "i live in sydney", fn)
+    assert second is first
+    assert len(calls) == 1
+
+
+def test_results_without_facts_are_not_stored(store):
+    cache = ResultCache("curator", store)
+    empty = CuratorResult(clean_text="", candidates=[], notes=["not valid JSON"])
+    assert cached_call(cache, "hello", lambda: empty) is empty
+    assert cache.get("hello") is None
+    remember(cache, "hello", empty)
+    assert cache.get("hello") is None
+
+
+def test_disabled_cache_always_calls():
+    assert cached_call(None, "hi", lambda: "x") == "x"
+    remember(None, "hi", _curated("Sydney"))  # no-op
+
+
+def test_results_persist_across_restarts(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    store = CacheStore(path)
+    ResultCache("curator", store).put("I live in Sydney", _curated("Sydney"))
+    enriched = EnricherResult(
+        relations=[EnricherRelation(subj="USER", rel="LIVES_IN", obj="Sydney", confidence=0.8, derived=False)],
+        notes=["n"],
+    )
+    ResultCache("enricher", store).put("I live in Sydney", enriched)
+    store.flush()
+
+    reopened = CacheStore(path)
+    curated = ResultCache("curator", reopened).get("I live in Sydney")
+    assert curated.as_dict() == _curated("Sydney").as_dict()
+    assert ResultCache("enricher", reopened).get("I live in Sydney").as_dict() == enriched.as_dict()
+
+
+def test_clear_forgets_memory_and_disk(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    store = CacheStore(path)
+    cache = ResultCache("curator", store)
+    cache.put("I live in Sydney", _curated("Sydney"))
+    store.flush()
+    cache.put("I live in Perth", _curated("Perth"))  # still pending
+
+    cache.clear()
+    store.clear()
+    store.flush()
+    assert cache.get("I live in Sydney") is None
+    assert list(CacheStore(path).rows("curator")) == []
+
+
+def test_store_is_bounded(tmp_path):
+    store = CacheStore(tmp_path / "cache.sqlite", max_rows=2)
+    cache = ResultCache("curator", store)
+    for city in ("Sydney", "Perth", "Hobart"):
+        cache.put(f"I live in {city}", _curated(city))
+        store.flush()
+    assert len(list(store.rows("curator"))) == 2
\ No newline at end of file